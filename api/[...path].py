@@ -58,8 +58,13 @@ try:
     print("  ✓ youtube_agent.app imported", file=sys.stderr, flush=True)
     
     print("  - Importing youtube_agent.app.api...", file=sys.stderr, flush=True)
-    from youtube_agent.app.api import app
+    # Time every module the app pulls in; cold starts are the worst-case latency
+    from youtube_agent.app.import_profile import ImportProfiler
+    with ImportProfiler() as import_profile:
+        from youtube_agent.app.api import app
     print("  ✓ FastAPI app imported successfully", file=sys.stderr, flush=True)
+    budget_ms = float(os.getenv("COLD_START_BUDGET_MS", "1500"))
+    print(import_profile.report(budget_ms=budget_ms), file=sys.stderr, flush=True)
 except Exception as e:
     print(f"✗ ERROR importing FastAPI app: {e}", file=sys.stderr, flush=True)
     print(traceback.format_exc(), file=sys.stderr, flush=True)
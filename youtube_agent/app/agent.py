@@ -1,139 +1,488 @@
-from typing import Any, Dict, List
+import asyncio
+import contextvars
+import json
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
 
-from langchain.chat_models import init_chat_model
-from langchain_core.messages import HumanMessage, SystemMessage, ToolMessage
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
 from langchain_core.runnables import RunnableLambda
 
-from .config import get_settings
-from .prompts import SYSTEM_PROMPT
+from .config import Settings, get_settings
+from .context import count_tokens, fit_messages, message_tokens, prompt_budget
+from .llm import get_chat_model, reload_chat_models, resolve_model_name
+from .prompts import FINALIZE_PROMPT, GUARD_FALLBACK_RESPONSE, SYSTEM_PROMPT
+from .tools.bulk import fetch_transcripts_batch, get_metadata_batch
 from .tools.extract_metadata import (
     get_full_metadata,
     get_thumbnails,
     get_trending_videos,
 )
-from .tools.fetch_transcript import fetch_transcript
+from .tools.fetch_transcript import fetch_transcript, get_transcript_window
+from .tools.search_transcripts import search_transcripts
 from .tools.search_videos import search_youtube
-from .tools.summarize import extract_video_id, truncate_text
+from .tools.summarize import extract_video_id, summarize_transcript, truncate_text
+from .tracing import count_llm_tokens, is_tool_error, record_llm_call, tool_span
 
 
-def _build_llm_with_tools():
-    settings = get_settings()
-    if settings.provider == "groq":
-        # Use Groq (free tier available)
-        from langchain_groq import ChatGroq
-
-        llm = ChatGroq(model=settings.model_name, api_key=settings.groq_api_key)
-    elif settings.provider == "openai":
-        from langchain_openai import ChatOpenAI
-
-        model_name = settings.openai_model or settings.model_name
-        llm = ChatOpenAI(model=model_name, api_key=settings.openai_api_key)
-    elif settings.provider == "bytez":
-        # Bytez is OpenAI-compatible; use ChatOpenAI with base_url and key
-        from langchain_openai import ChatOpenAI
-
-        # Default to gpt-4o-mini when provider is Bytez if not explicitly set
-        model_name = settings.model_name if settings.model_name else "gpt-4o-mini"
-        llm = ChatOpenAI(
-            model=model_name,
-            api_key=settings.bytez_api_key,
-            base_url=settings.bytez_base_url,
-        )
-    elif settings.provider == "cerebras":
-        # Cerebras Cloud: OpenAI-compatible endpoint at https://api.cerebras.ai/v1
-        # Supports tool calling via ChatOpenAI wrapper
-        from langchain_openai import ChatOpenAI
-
-        # Default model: gpt-oss-120b (as per Cerebras API documentation)
-        # Available models: gpt-oss-120b, llama-3.3-70b, etc.
-        model_name = settings.model_name or "gpt-oss-120b"
-        llm = ChatOpenAI(
-            model=model_name,
-            api_key=settings.cerebras_api_key,
-            base_url=settings.cerebras_base_url,
-        )
-    else:
-        # Fallback to Ollama if chosen
-        llm = init_chat_model(
-            settings.ollama_model,
-            model_provider="ollama",
-        )
+# Process-wide (llm_with_tools, chain) pairs keyed by (provider, model). Building
+# them creates the provider client (and its HTTP connection pool), so it is done
+# once and reused.
+_CHAIN_REGISTRY: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+_CHAIN_REGISTRY_LOCK = threading.Lock()
+
+# Bounded pool for blocking tool calls made from the async path.
+_TOOL_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_TOOL_EXECUTOR_LOCK = threading.Lock()
+
+
+def _build_llm_with_tools(settings: Optional[Settings] = None):
+    settings = settings or get_settings()
+    llm = get_chat_model(settings)
     tools = [
         extract_video_id,
         fetch_transcript,
+        get_transcript_window,
         search_youtube,
         get_full_metadata,
         get_trending_videos,
         get_thumbnails,
+        summarize_transcript,
+        get_metadata_batch,
+        fetch_transcripts_batch,
+        search_transcripts,
         truncate_text,
     ]
     return llm.bind_tools(tools)
 
 
-def _execute_tool(tool_mapping, tool_call):
-    try:
-        result = tool_mapping[tool_call["name"]].invoke(tool_call["args"])
-        # Ensure string content for ToolMessage
-        if isinstance(result, (dict, list)):
-            import json
-
-            content = json.dumps(result)
-        else:
-            content = str(result)
-    except Exception as exc:  # noqa: BLE001
-        content = f"Error: {str(exc)}"
+def _execute_tool(tool_mapping, tool_call, guard=None):
+    # LLM calls made by the tool (map-reduce summaries) count against guard's budget
+    sink = guard.add_tokens if guard is not None else None
+    with tool_span(tool_call["name"], tool_call["args"]) as span, count_llm_tokens(sink):
+        try:
+            result = tool_mapping[tool_call["name"]].invoke(tool_call["args"])
+            # Ensure string content for ToolMessage
+            if isinstance(result, (dict, list)):
+                content = json.dumps(result)
+            else:
+                content = str(result)
+        except Exception as exc:  # noqa: BLE001
+            content = f"Error: {str(exc)}"
+        span["result_size"] = len(content)
+        span["error"] = is_tool_error(content)
     return ToolMessage(content=content, tool_call_id=tool_call["id"])
 
 
+def _get_tool_executor() -> ThreadPoolExecutor:
+    global _TOOL_EXECUTOR
+    if _TOOL_EXECUTOR is None:
+        with _TOOL_EXECUTOR_LOCK:
+            if _TOOL_EXECUTOR is None:
+                _TOOL_EXECUTOR = ThreadPoolExecutor(
+                    max_workers=get_settings().tool_max_workers,
+                    thread_name_prefix="youtube-agent-tool",
+                )
+    return _TOOL_EXECUTOR
+
+
+async def _aexecute_tool(tool_mapping, tool_call, guard=None):
+    # Tool libraries are blocking; run them in the bounded pool so the event
+    # loop keeps serving other queries meanwhile.
+    loop = asyncio.get_running_loop()
+    # Copy the context so the request's trace follows the call into the pool
+    return await loop.run_in_executor(
+        _get_tool_executor(),
+        contextvars.copy_context().run,
+        _execute_tool,
+        tool_mapping,
+        tool_call,
+        guard,
+    )
+
+
+def _invoke_traced(tool, args: Dict[str, Any]) -> Any:
+    with tool_span(tool.name, args) as span:
+        try:
+            result = tool.invoke(args)
+        except Exception:
+            span["error"] = True
+            raise
+        span["result_size"] = len(json.dumps(result, default=str))
+        span["error"] = False
+    return result
+
+
+async def arun_tool(name: str, args: Dict[str, Any]) -> Any:
+    """
+    Run one tool outside the agent loop (e.g. from the intent router).
+
+    Uses the shared tool pool and shows up in the request trace like an agent
+    tool call, but returns the tool's raw result; exceptions propagate.
+    """
+    tool = _build_tool_mapping()[name]
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_tool_executor(), contextvars.copy_context().run, _invoke_traced, tool, args
+    )
+
+
+def _run_tool_calls(
+    tool_mapping, tool_calls, max_parallel: int, guard=None
+) -> List[ToolMessage]:
+    """Run one turn's tool calls concurrently; results keep the tool_call order."""
+    if len(tool_calls) <= 1 or max_parallel <= 1:
+        return [_execute_tool(tool_mapping, tc, guard) for tc in tool_calls]
+
+    executor = _get_tool_executor()
+    results: List[Optional[ToolMessage]] = [None] * len(tool_calls)
+    queued = iter(enumerate(tool_calls))
+    pending = {}
+
+    def _submit_next():
+        item = next(queued, None)
+        if item is not None:
+            index, tc = item
+            future = executor.submit(
+                contextvars.copy_context().run, _execute_tool, tool_mapping, tc, guard
+            )
+            pending[future] = index
+
+    # Sliding window: never more than max_parallel calls in flight per turn
+    for _ in range(max_parallel):
+        _submit_next()
+    while pending:
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            results[pending.pop(future)] = future.result()
+            _submit_next()
+    return results
+
+
+async def _arun_tool_calls(
+    tool_mapping, tool_calls, max_parallel: int, guard=None
+) -> List[ToolMessage]:
+    """Async counterpart of _run_tool_calls; gather() preserves the tool_call order."""
+    semaphore = asyncio.Semaphore(max(1, max_parallel))
+
+    async def _limited(tc):
+        async with semaphore:
+            return await _aexecute_tool(tool_mapping, tc, guard)
+
+    return list(await asyncio.gather(*(_limited(tc) for tc in tool_calls)))
+
+
 def _build_tool_mapping():
     return {
         "extract_video_id": extract_video_id,
         "fetch_transcript": fetch_transcript,
+        "get_transcript_window": get_transcript_window,
         "search_youtube": search_youtube,
         "get_full_metadata": get_full_metadata,
         "get_trending_videos": get_trending_videos,
         "get_thumbnails": get_thumbnails,
+        "summarize_transcript": summarize_transcript,
+        "get_metadata_batch": get_metadata_batch,
+        "fetch_transcripts_batch": fetch_transcripts_batch,
+        "search_transcripts": search_transcripts,
         "truncate_text": truncate_text,
     }
 
 
-def _recursive_processor(llm_with_tools):
+class _LoopGuard:
+    """Step, wall-clock and token limits for one agent run."""
+
+    def __init__(self, settings: Settings):
+        self.max_rounds = settings.agent_max_tool_rounds
+        self.deadline = time.monotonic() + settings.agent_deadline_seconds
+        self.max_tokens = settings.agent_max_tokens
+        self.rounds = 0
+        self.tokens = 0
+        # Tool threads add the tokens of LLM calls they make (add_tokens)
+        self._lock = threading.Lock()
+
+    def record(self, prompt: List[Any], response: Any) -> None:
+        """Add one LLM call's token usage (provider-reported when available)."""
+        usage = getattr(response, "usage_metadata", None)
+        if usage and usage.get("total_tokens"):
+            self.add_tokens(usage["total_tokens"])
+        else:
+            self.add_tokens(count_tokens(prompt) + message_tokens(response))
+
+    def add_tokens(self, tokens: int) -> None:
+        with self._lock:
+            self.tokens += tokens
+
+    def remaining(self) -> float:
+        return self.deadline - time.monotonic()
+
+    def tripped(self) -> Optional[str]:
+        """Reason the run must stop calling tools, or None to keep going."""
+        if self.rounds >= self.max_rounds:
+            return f"reached the limit of {self.max_rounds} tool rounds"
+        if self.remaining() <= 0:
+            return "ran out of time"
+        if self.tokens >= self.max_tokens:
+            return f"used its token budget ({self.tokens} tokens)"
+        return None
+
+
+def _should_continue(messages) -> bool:
+    last = messages[-1]
+    return bool(getattr(last, "tool_calls", None))
+
+
+def _finalize_prompt(messages: List[Any], reason: str) -> List[Any]:
+    """Close out pending tool calls and ask the model to answer with what it has."""
+    skipped = [
+        ToolMessage(content=f"Skipped: the agent {reason}.", tool_call_id=tc["id"])
+        for tc in getattr(messages[-1], "tool_calls", None) or []
+    ]
+    return messages + skipped + [HumanMessage(content=FINALIZE_PROMPT.format(reason=reason))]
+
+
+def _as_final(message: Any) -> Any:
+    # The model may still ask for tools; keep its text and drop the calls
+    if getattr(message, "tool_calls", None):
+        content = message.content if isinstance(message.content, str) else ""
+        return AIMessage(content=content or GUARD_FALLBACK_RESPONSE)
+    return message
+
+
+def _initial_messages(query: str) -> List[Any]:
+    # Start with system prompt to set expectations
+    return [
+        SystemMessage(content=SYSTEM_PROMPT),
+        HumanMessage(content=query),
+    ]
+
+
+def _agent_loop(llm_with_tools, settings: Settings):
+    """
+    Iterative tool-calling driver: call the model, run the tools it asks for,
+    repeat until it answers. _LoopGuard caps rounds, wall-clock time and
+    tokens; when a guard trips the model is asked for a final answer instead.
+    """
     tool_mapping = _build_tool_mapping()
+    max_parallel_tools = settings.max_parallel_tools
+    token_budget = prompt_budget(settings)
+
+    def _fit(messages):
+        # The full history is kept for the caller; only the prompt is trimmed
+        return fit_messages(messages, token_budget)
+
+    def _call(guard, messages):
+        prompt = _fit(messages)
+        started = time.perf_counter()
+        response = llm_with_tools.invoke(prompt)
+        record_llm_call(time.perf_counter() - started, response, count_tokens(prompt))
+        guard.record(prompt, response)
+        return response
+
+    async def _acall(guard, messages):
+        prompt = _fit(messages)
+        started = time.perf_counter()
+        response = await llm_with_tools.ainvoke(prompt)
+        record_llm_call(time.perf_counter() - started, response, count_tokens(prompt))
+        guard.record(prompt, response)
+        return response
+
+    def _run(x: Dict[str, Any]):
+        guard = _LoopGuard(settings)
+        messages = _initial_messages(x["query"])
+        messages.append(_call(guard, messages))
+        while _should_continue(messages):
+            reason = guard.tripped()
+            if reason:
+                final_prompt = _finalize_prompt(messages, reason)
+                return final_prompt + [_as_final(_call(guard, final_prompt))]
+            tool_messages = _run_tool_calls(
+                tool_mapping, messages[-1].tool_calls, max_parallel_tools, guard
+            )
+            guard.rounds += 1
+            messages = messages + tool_messages
+            messages.append(_call(guard, messages))
+        return messages
 
-    def _should_continue(messages):
-        last = messages[-1]
-        return bool(getattr(last, "tool_calls", None))
-
-    def _process_once(messages):
-        last = messages[-1]
-        tool_messages = [
-            _execute_tool(tool_mapping, tc) for tc in getattr(last, "tool_calls", [])
-        ]
-        # System message is already at the start from first_step, just append tool results
-        updated = messages + tool_messages
-        next_ai = llm_with_tools.invoke(updated)
-        return updated + [next_ai]
-
-    def _recur(messages):
-        if _should_continue(messages):
-            return _recur(_process_once(messages))
+    async def _arun(x: Dict[str, Any]):
+        guard = _LoopGuard(settings)
+        messages = _initial_messages(x["query"])
+        messages.append(await _acall(guard, messages))
+        while _should_continue(messages):
+            reason = guard.tripped()
+            if reason is None:
+                try:
+                    tool_messages = await asyncio.wait_for(
+                        _arun_tool_calls(
+                            tool_mapping, messages[-1].tool_calls, max_parallel_tools, guard
+                        ),
+                        timeout=max(guard.remaining(), 0.001),
+                    )
+                except asyncio.TimeoutError:
+                    reason = "ran out of time"
+            if reason:
+                final_prompt = _finalize_prompt(messages, reason)
+                return final_prompt + [_as_final(await _acall(guard, final_prompt))]
+            guard.rounds += 1
+            messages = messages + tool_messages
+            messages.append(await _acall(guard, messages))
         return messages
 
-    return RunnableLambda(_recur)
+    return RunnableLambda(_run, afunc=_arun)
+
+
+def build_universal_chain(settings: Optional[Settings] = None, llm_with_tools=None):
+    settings = settings or get_settings()
+    llm_with_tools = llm_with_tools or _build_llm_with_tools(settings)
+    return _agent_loop(llm_with_tools, settings)
+
+
+def _get_registry_entry() -> Tuple[Any, Any]:
+    settings = get_settings()
+    key = (settings.provider, resolve_model_name(settings))
+    entry = _CHAIN_REGISTRY.get(key)
+    if entry is None:
+        with _CHAIN_REGISTRY_LOCK:
+            entry = _CHAIN_REGISTRY.get(key)
+            if entry is None:
+                llm_with_tools = _build_llm_with_tools(settings)
+                entry = (llm_with_tools, build_universal_chain(settings, llm_with_tools))
+                _CHAIN_REGISTRY[key] = entry
+    return entry
+
+
+def get_universal_chain():
+    """
+    Return the shared chain for the configured provider and model.
 
+    The chain (LLM client, bound tools and tool mapping) is built on first use
+    and reused by every later request. Call reload_chains() after changing
+    settings to force a rebuild.
+    """
+    return _get_registry_entry()[1]
 
-def build_universal_chain():
-    llm_with_tools = _build_llm_with_tools()
 
-    def first_step(x: Dict[str, Any]):
-        # Start with system prompt to set expectations
-        messages = [
-            SystemMessage(content=SYSTEM_PROMPT),
-            HumanMessage(content=x["query"]),
-        ]
-        ai1 = llm_with_tools.invoke(messages)
-        return messages + [ai1]
+def reload_chains() -> int:
+    """Drop all cached chains so the next request rebuilds them. Returns the number dropped."""
+    with _CHAIN_REGISTRY_LOCK:
+        dropped = len(_CHAIN_REGISTRY)
+        _CHAIN_REGISTRY.clear()
+    reload_chat_models()
+    return dropped
+
+
+async def astream_query(query: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run the agent loop and yield progress events as they happen.
+
+    Events:
+        {"type": "tool_start", "name", "args", "id"}
+        {"type": "tool_end", "name", "id", "elapsed_ms", "error"}
+        {"type": "token", "content"}   - answer text as the LLM produces it
+        {"type": "reset"}              - the tokens sent since the last tool round
+                                         were not the answer (the turn went on to
+                                         call tools); drop them
+        {"type": "guard", "reason"}    - a step/time/token limit stopped tool use
+        {"type": "done", "response", "tools"}
+
+    done.response is the authoritative answer.
+    """
+    settings = get_settings()
+    llm_with_tools = _get_registry_entry()[0]
+    tool_mapping = _build_tool_mapping()
+    semaphore = asyncio.Semaphore(max(1, settings.max_parallel_tools))
+    budget = prompt_budget(settings)
+    guard = _LoopGuard(settings)
+    messages = _initial_messages(query)
+    tools_used: List[str] = []
+    stop_reason: Optional[str] = None
+
+    async def _timed_tool(index, tc):
+        async with semaphore:
+            started = time.perf_counter()
+            message = await _aexecute_tool(tool_mapping, tc, guard)
+            return index, message, (time.perf_counter() - started) * 1000
 
-    return RunnableLambda(first_step) | _recursive_processor(llm_with_tools)
+    while True:
+        if stop_reason:
+            messages = _finalize_prompt(messages, stop_reason)
+            yield {"type": "guard", "reason": stop_reason}
+        prompt = fit_messages(messages, budget)
+        started = time.perf_counter()
+        ai = None
+        # Text streams live until the turn starts a tool call; text after that
+        # is held back, and text already sent is retracted with a reset event.
+        # After a guard stop no tools run, so everything streams.
+        streamed = False
+        calling = False
+        held: List[str] = []
+        async for chunk in llm_with_tools.astream(prompt):
+            calling = calling or bool(getattr(chunk, "tool_call_chunks", None))
+            if isinstance(chunk.content, str) and chunk.content:
+                if calling and not stop_reason:
+                    held.append(chunk.content)
+                else:
+                    streamed = True
+                    yield {"type": "token", "content": chunk.content}
+            ai = chunk if ai is None else ai + chunk
+        record_llm_call(time.perf_counter() - started, ai, count_tokens(prompt))
+        guard.record(prompt, ai)
+        if stop_reason:
+            ai = _as_final(ai)
+            if not streamed:
+                # The model sent no text and _as_final supplied the fallback
+                yield {"type": "token", "content": ai.content}
+        messages.append(ai)
+        tool_calls = getattr(ai, "tool_calls", None) or []
+        if not tool_calls:
+            if held:
+                yield {"type": "token", "content": "".join(held)}
+            break
+        if streamed:
+            yield {"type": "reset"}
+        stop_reason = guard.tripped()
+        if stop_reason:
+            continue
 
+        for tc in tool_calls:
+            tools_used.append(tc["name"])
+            yield {"type": "tool_start", "name": tc["name"], "args": tc["args"], "id": tc["id"]}
+        round_started = time.perf_counter()
+        tasks = [asyncio.create_task(_timed_tool(i, tc)) for i, tc in enumerate(tool_calls)]
+        results: List[Optional[ToolMessage]] = [None] * len(tool_calls)
+        try:
+            # Same deadline as _arun: a slow tool must not hold the stream open
+            for next_done in asyncio.as_completed(tasks, timeout=max(guard.remaining(), 0.001)):
+                index, message, elapsed_ms = await next_done
+                results[index] = message
+                yield {
+                    "type": "tool_end",
+                    "name": tool_calls[index]["name"],
+                    "id": tool_calls[index]["id"],
+                    "elapsed_ms": round(elapsed_ms, 1),
+                    "error": is_tool_error(message.content),
+                }
+        except asyncio.TimeoutError:
+            for task in tasks:
+                task.cancel()
+            elapsed_ms = (time.perf_counter() - round_started) * 1000
+            for index, tc in enumerate(tool_calls):
+                if results[index] is None:
+                    # Finished calls keep their output; the rest are closed out as skipped
+                    results[index] = ToolMessage(
+                        content="Skipped: the agent ran out of time.", tool_call_id=tc["id"]
+                    )
+                    yield {
+                        "type": "tool_end",
+                        "name": tc["name"],
+                        "id": tc["id"],
+                        "elapsed_ms": round(elapsed_ms, 1),
+                        "error": True,
+                    }
+        messages.extend(results)
+        guard.rounds += 1
+        if guard.remaining() <= 0:
+            stop_reason = "ran out of time"
 
+    yield {"type": "done", "response": ai.content if ai is not None else "", "tools": tools_used}
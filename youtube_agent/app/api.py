@@ -1,18 +1,51 @@
 """FastAPI REST API for YouTube Agent."""
 
-from typing import List, Optional
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, List, Optional
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
-from .agent import build_universal_chain
 from .cache import clear_cache, get_cache_stats
-from .config import get_settings
+from .config import Settings, get_settings, load_env
+from . import trending
+from .transcript_index import get_transcript_index
+from .tracing import REQUEST_LATENCY, render_metrics, trace_request
+from .ydl_pool import get_ydl_pool
+
+# The agent, router and response cache pull in LangChain and the tool
+# libraries. Endpoints that need them import them on first use, so a cold
+# start serving /health, /metrics or /cache/stats never loads them.
 
 # Detect Vercel environment
 import os
+load_env()  # CORS settings below are read straight from the environment
 VERCEL = os.getenv("VERCEL") == "1"
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    Optionally build yt-dlp extractors before the first metadata request, and
+    keep TRENDING_REGIONS snapshots fresh so get_trending_videos never waits
+    on YouTube. Reads Settings(), not get_settings(): the app must boot
+    without a provider API key.
+    """
+    count = Settings().ytdlp_pool_prewarm
+    if count > 0:
+        # In the background: startup (and /health) should not wait for yt-dlp
+        asyncio.get_running_loop().run_in_executor(None, get_ydl_pool().prewarm, "full", None, count)
+    trending.start_refresher()
+    try:
+        yield
+    finally:
+        trending.stop_refresher()
+
+
 # For Vercel with Mangum, we need root_path="/api" so FastAPI knows the base path
 # This ensures routes like /health work correctly when accessed via /api/health
 app = FastAPI(
@@ -20,6 +53,7 @@ app = FastAPI(
     description="Intelligent YouTube interaction system with recursive tool-calling",
     version="2.0.0",
     root_path="/api" if VERCEL else "",
+    lifespan=lifespan,
 )
 
 # CORS middleware for frontend and Vercel
@@ -94,11 +128,13 @@ except Exception as e:
 class QueryRequest(BaseModel):
     query: str
     use_cache: bool = True
+    include_trace: bool = False
 
 
 class BatchQueryRequest(BaseModel):
     queries: List[str]
     use_cache: bool = True
+    include_trace: bool = False
 
 
 class QueryResponse(BaseModel):
@@ -106,6 +142,12 @@ class QueryResponse(BaseModel):
     response: str
     success: bool
     error: Optional[str] = None
+    elapsed_ms: Optional[float] = None
+    trace: Optional[Dict[str, Any]] = None
+    # True when served from the whole-query response cache
+    cached: bool = False
+    # Intent answered by the router without the LLM (greeting, metadata, thumbnails, search)
+    route: Optional[str] = None
 
 
 class BatchQueryResponse(BaseModel):
@@ -115,6 +157,100 @@ class BatchQueryResponse(BaseModel):
     failed: int
 
 
+def _is_rate_limit_error(error_str: str) -> bool:
+    return "429" in error_str or "rate_limit" in error_str.lower() or "Rate limit" in error_str
+
+
+class _BatchBackoff:
+    """Shared back-off for one batch: a 429 on any item pauses every item."""
+
+    def __init__(self, base_delay: float):
+        self.base_delay = base_delay
+        self.resume_at = 0.0
+        self.strikes = 0
+
+    async def wait(self):
+        delay = self.resume_at - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    def trip(self):
+        # Exponential back-off across the batch, not per item
+        self.strikes += 1
+        delay = self.base_delay * (2 ** (self.strikes - 1))
+        self.resume_at = max(self.resume_at, time.monotonic() + delay)
+
+
+async def _fast_answer(query: str, use_cache: bool) -> Optional[QueryResponse]:
+    """
+    Answer without the agent when possible: the intent router first, then the
+    response cache. Returns None when the query needs a full agent run.
+    """
+    from . import response_cache, router
+
+    started = time.perf_counter()
+    routed = await router.route(query)
+    if routed is not None:
+        response = QueryResponse(
+            query=query, response=routed.response, success=True, route=routed.intent
+        )
+    else:
+        entry = await response_cache.lookup(query) if use_cache else None
+        if entry is None:
+            return None
+        response = QueryResponse(query=query, response=entry["response"], success=True, cached=True)
+    response.elapsed_ms = round((time.perf_counter() - started) * 1000, 1)
+    return response
+
+
+def _query_error(e: Exception) -> HTTPException:
+    """Translate an agent failure into the HTTPException returned to clients."""
+    error_str = str(e)
+    
+    # Detect HTML responses from LLM API (wrong endpoint/auth)
+    if "<!DOCTYPE html>" in error_str or "<html" in error_str.lower() or "cerebras cloud" in error_str.lower():
+        settings = get_settings()
+        provider = settings.provider
+        return HTTPException(
+            status_code=500,
+            detail={
+                "error": "LLM API returned HTML instead of JSON",
+                "message": f"The {provider.upper()} API endpoint returned a website page instead of API response.",
+                "likely_causes": [
+                    "API endpoint URL is incorrect",
+                    "API key is missing or invalid",
+                    "API endpoint requires different authentication",
+                    "The provider's API structure has changed"
+                ],
+                "suggestions": [
+                    f"Verify your {provider.upper()}_API_KEY is correct",
+                    f"Check the {provider.upper()}_BASE_URL endpoint",
+                    "Try switching to a different LLM provider (groq, openai)",
+                    "Check the provider's documentation for the correct API endpoint"
+                ],
+                "provider": provider,
+                "original_error_preview": error_str[:500] if len(error_str) > 500 else error_str
+            }
+        )
+    
+    # Handle rate limit errors with better messaging
+    if _is_rate_limit_error(error_str):
+        return HTTPException(
+            status_code=429,
+            detail={
+                "error": "Rate limit exceeded",
+                "message": "You've reached the daily token limit for your LLM API. Please try again later or upgrade your plan.",
+                "suggestion": "Wait for the rate limit to reset or upgrade your API plan",
+                "original_error": error_str
+            }
+        )
+    
+    return HTTPException(
+        status_code=500,
+        detail=f"Error processing query: {str(e)}",
+    )
+
+
 @app.get("/")
 async def root():
     """Root endpoint with API information."""
@@ -123,9 +259,12 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "/query": "POST - Single query processing",
+            "/query/stream": "POST - Single query as Server-Sent Events (tool progress + answer tokens)",
             "/batch": "POST - Batch query processing",
             "/cache/stats": "GET - Cache statistics",
             "/cache/clear": "POST - Clear cache",
+            "/chain/reload": "POST - Rebuild LLM client after settings change",
+            "/metrics": "GET - Prometheus latency histograms and counters",
             "/health": "GET - Health check",
         },
     }
@@ -140,80 +279,85 @@ async def health_check():
 @app.post("/query", response_model=QueryResponse)
 async def process_query(request: QueryRequest):
     """Process a single query."""
-    try:
-        # Quick greeting guard to avoid unnecessary tool-calls
-        simple_greetings = {"hi", "hello", "hey", "hola", "yo"}
-        if request.query.strip().lower() in simple_greetings:
-            return QueryResponse(
-                query=request.query,
-                response=(
-                    "Hello! I'm your YouTube Agent. I can search videos, fetch transcripts, "
-                    "summarize content, and provide sources. Ask me about a video or topic, "
-                    "e.g. 'Summarize https://youtu.be/...'") ,
-                success=True,
-            )
+    from . import response_cache
+    from .agent import get_universal_chain
 
-        chain = build_universal_chain()
-        messages = chain.invoke({"query": request.query})
+    try:
+        # Greetings, single-tool intents and repeated queries skip the agent
+        fast = await _fast_answer(request.query, request.use_cache)
+        if fast is not None:
+            return fast
+
+        started = time.perf_counter()
+        chain = get_universal_chain()
+        with trace_request() as trace:
+            messages = await chain.ainvoke({"query": request.query})
         final = messages[-1]
-        
-        # Extract tool calls information for processing status
-        tool_calls_info = []
-        for msg in messages:
-            if hasattr(msg, 'tool_calls') and msg.tool_calls:
-                for tc in msg.tool_calls:
-                    tool_calls_info.append(tc.get('name', 'unknown_tool'))
-        
+        elapsed = time.perf_counter() - started
+        REQUEST_LATENCY.observe(elapsed, endpoint="query")
+        # use_cache=false skips the lookup but still refreshes the stored answer
+        if response_cache.is_cacheable(messages):
+            await response_cache.store(request.query, final.content)
+
         return QueryResponse(
             query=request.query,
             response=final.content,
             success=True,
+            elapsed_ms=round(elapsed * 1000, 1),
+            trace=trace.as_dict() if request.include_trace else None,
         )
     except Exception as e:
-        error_str = str(e)
-        
-        # Detect HTML responses from LLM API (wrong endpoint/auth)
-        if "<!DOCTYPE html>" in error_str or "<html" in error_str.lower() or "cerebras cloud" in error_str.lower():
-            settings = get_settings()
-            provider = settings.provider
-            raise HTTPException(
-                status_code=500,
-                detail={
-                    "error": "LLM API returned HTML instead of JSON",
-                    "message": f"The {provider.upper()} API endpoint returned a website page instead of API response.",
-                    "likely_causes": [
-                        "API endpoint URL is incorrect",
-                        "API key is missing or invalid",
-                        "API endpoint requires different authentication",
-                        "The provider's API structure has changed"
-                    ],
-                    "suggestions": [
-                        f"Verify your {provider.upper()}_API_KEY is correct",
-                        f"Check the {provider.upper()}_BASE_URL endpoint",
-                        "Try switching to a different LLM provider (groq, openai)",
-                        "Check the provider's documentation for the correct API endpoint"
-                    ],
-                    "provider": provider,
-                    "original_error_preview": error_str[:500] if len(error_str) > 500 else error_str
-                }
-            )
-        
-        # Handle rate limit errors with better messaging
-        if "429" in error_str or "rate_limit" in error_str.lower() or "Rate limit" in error_str:
-            raise HTTPException(
-                status_code=429,
-                detail={
-                    "error": "Rate limit exceeded",
-                    "message": "You've reached the daily token limit for your LLM API. Please try again later or upgrade your plan.",
-                    "suggestion": "Wait for the rate limit to reset or upgrade your API plan",
-                    "original_error": error_str
-                }
-            )
-        
-        raise HTTPException(
-            status_code=500,
-            detail=f"Error processing query: {str(e)}",
-        )
+        raise _query_error(e)
+
+
+def _sse(event: dict) -> str:
+    return f"data: {json.dumps(event)}\n\n"
+
+
+@app.post("/query/stream")
+async def process_query_stream(request: QueryRequest):
+    """Process a single query, streaming tool progress and answer tokens as SSE."""
+    from . import response_cache
+    from .agent import astream_query
+
+    async def _events():
+        started = time.perf_counter()
+        try:
+            fast = await _fast_answer(request.query, request.use_cache)
+            if fast is not None:
+                yield _sse({"type": "token", "content": fast.response})
+                yield _sse(
+                    {
+                        "type": "done",
+                        "response": fast.response,
+                        "tools": [],
+                        "cached": fast.cached,
+                        "route": fast.route,
+                    }
+                )
+                return
+            cacheable = True
+            with trace_request() as trace:
+                async for event in astream_query(request.query):
+                    # Same rule as response_cache.is_cacheable: no guard stop, no failed tool
+                    if event["type"] == "guard" or (event["type"] == "tool_end" and event["error"]):
+                        cacheable = False
+                    if event["type"] == "done":
+                        REQUEST_LATENCY.observe(time.perf_counter() - started, endpoint="stream")
+                        if cacheable:
+                            await response_cache.store(request.query, event["response"])
+                        if request.include_trace:
+                            event["trace"] = trace.as_dict()
+                    yield _sse(event)
+        except Exception as e:
+            error = _query_error(e)
+            yield _sse({"type": "error", "status": error.status_code, "detail": error.detail})
+
+    return StreamingResponse(
+        _events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 @app.post("/batch", response_model=BatchQueryResponse)
@@ -221,37 +365,74 @@ async def process_batch(request: BatchQueryRequest):
     """Process multiple queries in batch."""
     if not request.queries:
         raise HTTPException(status_code=400, detail="No queries provided")
+    from . import response_cache
+    from .agent import get_universal_chain
 
-    results = []
-    successful = 0
-    failed = 0
+    settings = get_settings()
+    chain = get_universal_chain()
+    semaphore = asyncio.Semaphore(max(1, settings.batch_concurrency))
+    backoff = _BatchBackoff(settings.batch_rate_limit_backoff)
 
-    chain = build_universal_chain()
-    for query in request.queries:
+    def _failed(query: str, error: str, started: float) -> QueryResponse:
+        return QueryResponse(
+            query=query,
+            response="",
+            success=False,
+            error=error,
+            elapsed_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+
+    async def _run_one(query: str) -> QueryResponse:
+        # The router may call a tool: one item's failure must not fail the batch
+        started = time.perf_counter()
         try:
-            messages = chain.invoke({"query": query})
-            final = messages[-1]
-            results.append(
-                QueryResponse(
-                    query=query,
-                    response=final.content,
-                    success=True,
-                )
+            fast = await asyncio.wait_for(
+                _fast_answer(query, request.use_cache), timeout=settings.batch_query_timeout
             )
-            successful += 1
+        except asyncio.TimeoutError:
+            return _failed(query, f"Query timed out after {settings.batch_query_timeout}s", started)
         except Exception as e:
-            results.append(
-                QueryResponse(
-                    query=query,
-                    response="",
-                    success=False,
-                    error=str(e),
-                )
-            )
-            failed += 1
+            return _failed(query, str(e), started)
+        if fast is not None:
+            return fast
+        async with semaphore:
+            started = time.perf_counter()
+            error = ""
+            for attempt in range(settings.batch_rate_limit_retries + 1):
+                await backoff.wait()
+                try:
+                    with trace_request() as trace:
+                        messages = await asyncio.wait_for(
+                            chain.ainvoke({"query": query}),
+                            timeout=settings.batch_query_timeout,
+                        )
+                    elapsed = time.perf_counter() - started
+                    REQUEST_LATENCY.observe(elapsed, endpoint="batch_item")
+                    if response_cache.is_cacheable(messages):
+                        await response_cache.store(query, messages[-1].content)
+                    return QueryResponse(
+                        query=query,
+                        response=messages[-1].content,
+                        success=True,
+                        elapsed_ms=round(elapsed * 1000, 1),
+                        trace=trace.as_dict() if request.include_trace else None,
+                    )
+                except asyncio.TimeoutError:
+                    error = f"Query timed out after {settings.batch_query_timeout}s"
+                    break
+                except Exception as e:
+                    error = str(e)
+                    if not _is_rate_limit_error(error):
+                        break
+                    backoff.trip()
+            return _failed(query, error, started)
+
+    results = await asyncio.gather(*(_run_one(q) for q in request.queries))
+    successful = sum(1 for r in results if r.success)
+    failed = len(results) - successful
 
     return BatchQueryResponse(
-        results=results,
+        results=list(results),
         total=len(request.queries),
         successful=successful,
         failed=failed,
@@ -261,16 +442,40 @@ async def process_batch(request: BatchQueryRequest):
 @app.get("/cache/stats")
 async def cache_stats():
     """Get cache statistics."""
-    return get_cache_stats()
+    return {
+        **get_cache_stats(),
+        "ytdlp_pool": get_ydl_pool().stats(),
+        "trending": trending.stats(),
+        "transcript_index": get_transcript_index().stats(),
+    }
 
 
 @app.post("/cache/clear")
 async def cache_clear():
     """Clear all cached data."""
+    from . import response_cache
+
     clear_cache()
+    response_cache.clear_semantic_index()
+    get_transcript_index().clear()
     return {"message": "Cache cleared successfully"}
 
 
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Latency histograms and counters in Prometheus text format."""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.post("/chain/reload")
+async def chain_reload():
+    """Drop cached LLM clients/chains so the next query picks up new settings."""
+    from .agent import reload_chains
+
+    dropped = reload_chains()
+    return {"message": "Chains reloaded", "dropped": dropped}
+
+
 if __name__ == "__main__":
     import uvicorn
 
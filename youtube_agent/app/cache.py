@@ -1,17 +1,40 @@
 """Caching module for YouTube API calls to reduce redundant requests."""
 
+import asyncio
 import hashlib
+import inspect
 import json
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
 from functools import wraps
-from typing import Any, Callable, Optional
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .config import Settings
+from .tracing import record_cache_event
 
 try:
     import diskcache as dc
 except ImportError:
     dc = None
 
-# In-memory cache fallback
-_memory_cache: dict = {}
+# One diskcache handle per process, opened lazily by get_cache_backend()
+_disk_cache: Any = None
+_disk_cache_lock = threading.Lock()
+
+# In-memory cache fallback: one bounded LRU per decorated function
+_memory_caches: Dict[str, "MemoryCache"] = {}
+
+# Hit/miss/latency counters per decorated function
+_function_stats: Dict[str, "_FunctionStats"] = {}
+
+# Keys each function stored in diskcache, for eviction counting (see cached())
+_recent_keys: Dict[str, "MemoryCache"] = {}
+
+# Sentinel for "not in cache" so falsy results (e.g. []) can be cached too
+_MISS = object()
 
 
 def _get_cache_key(func_name: str, *args, **kwargs) -> str:
@@ -25,65 +48,400 @@ def _get_cache_key(func_name: str, *args, **kwargs) -> str:
     return hashlib.md5(key_str.encode()).hexdigest()
 
 
+# Error results are cached with a short TTL so transient failures are retried
+# soon; failures that a retry cannot fix are kept longer (still below the
+# success TTL). Markers come from yt-dlp and youtube_transcript_api messages.
+_PERMANENT_ERROR_MARKERS = (
+    "subtitles are disabled",
+    "no transcripts were found",
+    "no longer available",
+    "video unavailable",
+    "private video",
+    "invalid video id",
+    "is unplayable",
+    "not translatable",
+    "translation language is not available",
+    "has been removed",
+    "unsupported url",
+    "invalid youtube url",
+)
+
+
+def _error_message(result: Any) -> Optional[str]:
+    """Return the error text if a tool result is an error payload, else None."""
+    if isinstance(result, dict) and "error" in result:
+        return str(result["error"])
+    if isinstance(result, str) and result.startswith("Error"):
+        return result
+    if (
+        isinstance(result, list)
+        and result
+        and all(isinstance(item, dict) and "error" in item for item in result)
+    ):
+        return str(result[0]["error"])
+    return None
+
+
+def _error_kind(result: Any) -> Optional[str]:
+    """Classify a result as None (success), "permanent" or "transient" error."""
+    message = _error_message(result)
+    if message is None:
+        return None
+    lowered = message.lower()
+    if any(marker in lowered for marker in _PERMANENT_ERROR_MARKERS):
+        return "permanent"
+    return "transient"
+
+
+def _estimate_size(value: Any) -> int:
+    """Approximate in-memory footprint of a cached value in bytes."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8", errors="ignore"))
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:  # noqa: BLE001
+        return len(str(value))
+
+
+class MemoryCache:
+    """
+    Bounded in-memory cache with O(1) get/set, LRU eviction and lazy TTL expiry.
+
+    Entries live in an OrderedDict in least- to most-recently-used order.
+    Expired entries are dropped when they are read or reach the LRU end.
+    If max_bytes is set, entries are also weighed by their estimated size so a
+    long transcript counts for more than a short search result.
+    """
+
+    def __init__(self, max_size: int = 1000, max_bytes: Optional[int] = None):
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        self._data: "OrderedDict[str, Tuple[Any, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires_at, _ = entry
+            if expires_at and expires_at <= time.monotonic():
+                self._remove(key)
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Any, expire: Optional[float] = None) -> None:
+        size = _estimate_size(value) if self.max_bytes else 0
+        expires_at = time.monotonic() + expire if expire else 0.0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, expires_at, size)
+            self.bytes += size
+            while self._data and (
+                len(self._data) > self.max_size
+                or (self.max_bytes and self.bytes > self.max_bytes and len(self._data) > 1)
+            ):
+                oldest_key, (_, oldest_expiry, _) = next(iter(self._data.items()))
+                self._remove(oldest_key)
+                # Dropping an already-expired entry is not a capacity eviction
+                if not oldest_expiry or oldest_expiry > time.monotonic():
+                    self.evictions += 1
+
+    def _remove(self, key: str) -> None:
+        _, _, size = self._data.pop(key)
+        self.bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self.bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class _FunctionStats:
+    """Counters for one decorated function."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+        self.bytes_stored = 0
+        self.negative_stored = 0
+        self.miss_seconds = 0.0
+
+    def record(self, **increments) -> None:
+        with self._lock:
+            for name, amount in increments.items():
+                setattr(self, name, getattr(self, name) + amount)
+
+    def as_dict(self) -> dict:
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            "evictions": self.evictions,
+            "bytes_stored": self.bytes_stored,
+            "negative_stored": self.negative_stored,
+            "avg_miss_latency_ms": (
+                round(self.miss_seconds / self.misses * 1000, 1) if self.misses else None
+            ),
+        }
+
+
 def get_cache_backend(ttl: int = 3600) -> Any:
-    """Get cache backend (diskcache if available, else memory)."""
-    if dc is not None:
-        return dc.Cache("./.cache", size_limit=100 * 1024 * 1024)  # 100MB limit
-    return _memory_cache
+    """Get the shared diskcache handle, or None when diskcache is unavailable."""
+    global _disk_cache
+    if dc is None:
+        return None
+    if _disk_cache is None:
+        with _disk_cache_lock:
+            if _disk_cache is None:
+                settings = Settings()
+                _disk_cache = dc.Cache(
+                    settings.cache_dir,
+                    size_limit=settings.cache_size_limit_mb * 1024 * 1024,
+                )
+    return _disk_cache
+
 
+def get_named_cache(name: str, max_size: int = 1000, max_bytes: Optional[int] = None) -> Any:
+    """
+    Cache for callers that build their own keys (e.g. the response cache).
 
-def cached(ttl: int = 3600, max_size: int = 1000):
+    Returns the shared diskcache handle, or a MemoryCache registered under
+    name so clear_cache() empties it too. Its counters appear in
+    get_cache_stats() under name.
+    """
+    _function_stats.setdefault(name, _FunctionStats())
+    backend = get_cache_backend()
+    if backend is not None:
+        return backend
+    return _memory_caches.setdefault(name, MemoryCache(max_size=max_size, max_bytes=max_bytes))
+
+
+def record_lookup(name: str, hit: bool) -> None:
+    """Count a hit or miss for a get_named_cache() user."""
+    _function_stats.setdefault(name, _FunctionStats()).record(**{"hits" if hit else "misses": 1})
+
+
+class _SingleFlight:
+    """
+    Coalesce concurrent calls that share a cache key.
+
+    The first caller (the leader) runs the function; later callers wait for
+    its result instead of repeating the work. Thread callers wait on a
+    concurrent.futures.Future, asyncio callers on an asyncio.Future.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._async_calls: Dict[Tuple[int, str], asyncio.Future] = {}
+
+    def run(self, key: str, compute: Callable[[], Any]) -> Any:
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+        if not leader:
+            return future.result()
+        try:
+            result = compute()
+        except BaseException as exc:
+            future.set_exception(exc)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+
+    async def arun(self, key: str, compute: Callable[[], Awaitable[Any]]) -> Any:
+        # asyncio futures belong to one event loop, so coalesce per loop
+        loop = asyncio.get_running_loop()
+        slot = (id(loop), key)
+        while True:
+            future = self._async_calls.get(slot)
+            if future is None:
+                break
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                # The leader was cancelled (e.g. a batch item timed out): its
+                # caller gave up, not this one, so try again as the new leader
+                if not future.cancelled():
+                    raise
+        future = loop.create_future()
+        self._async_calls[slot] = future
+        try:
+            result = await compute()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as exc:
+            future.set_exception(exc)
+            # Consume the exception so a leader without followers does not log it
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            self._async_calls.pop(slot, None)
+
+
+_single_flight = _SingleFlight()
+
+
+def cached(
+    ttl: int = 3600,
+    max_size: int = 1000,
+    max_bytes: Optional[int] = None,
+    negative_ttl: int = 60,
+    permanent_negative_ttl: int = 6 * 3600,
+):
     """
     Decorator to cache function results.
-    
+
+    Concurrent calls with the same arguments are coalesced: only the first
+    one runs the function on a cache miss. Works for sync and async functions.
+    Error results ({"error": ...} dicts, lists of them, or "Error: ..." strings)
+    are cached under a separate, shorter TTL.
+
     Args:
         ttl: Time to live in seconds (default: 1 hour)
         max_size: Maximum cache entries (for memory cache)
+        max_bytes: Optional size budget in bytes (for memory cache)
+        negative_ttl: TTL for transient errors such as network failures
+        permanent_negative_ttl: TTL for errors a retry cannot fix (e.g. transcripts disabled)
     """
-    cache_backend = get_cache_backend(ttl)
+    disk_backend = get_cache_backend(ttl)
 
     def decorator(func: Callable) -> Callable:
         func_name = func.__name__
+        stats = _function_stats.setdefault(func_name, _FunctionStats())
+        if disk_backend is not None:
+            cache_backend = disk_backend
+            # diskcache culls silently; remember what we stored (bounded, expiring
+            # with the entry) so a miss on a still-live key counts as an eviction
+            recent_keys: Optional[MemoryCache] = _recent_keys.setdefault(
+                func_name, MemoryCache(max_size=10000)
+            )
+        else:
+            cache_backend = _memory_caches.setdefault(
+                func_name, MemoryCache(max_size=max_size, max_bytes=max_bytes)
+            )
+            recent_keys = None
+
+        def _lookup(cache_key: str) -> Any:
+            return cache_backend.get(cache_key, default=_MISS)
+
+        def _store(cache_key: str, result: Any) -> None:
+            kind = _error_kind(result)
+            if kind is None:
+                expire = ttl
+            elif kind == "permanent":
+                expire = min(ttl, permanent_negative_ttl)
+            else:
+                expire = min(ttl, negative_ttl)
+            if expire <= 0:
+                return
+            cache_backend.set(cache_key, result, expire=expire)
+            stats.record(bytes_stored=_estimate_size(result), negative_stored=int(kind is not None))
+            if recent_keys is not None:
+                recent_keys.set(cache_key, True, expire=expire)
+
+        def _note_hit() -> None:
+            stats.record(hits=1)
+            record_cache_event(hit=True)
+
+        def _note_miss(cache_key: str, elapsed: float) -> None:
+            stats.record(misses=1, miss_seconds=elapsed)
+            if recent_keys is not None and recent_keys.get(cache_key):
+                stats.record(evictions=1)
+
+        if inspect.iscoroutinefunction(func):
+
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                cache_key = _get_cache_key(func_name, *args, **kwargs)
+                result = _lookup(cache_key)
+                if result is not _MISS:
+                    _note_hit()
+                    return result
+
+                leader = []
+
+                async def _compute():
+                    leader.append(True)
+                    # Re-check: the previous leader may have just stored it
+                    value = _lookup(cache_key)
+                    if value is _MISS:
+                        record_cache_event(hit=False)
+                        started = time.perf_counter()
+                        try:
+                            value = await func(*args, **kwargs)
+                        finally:
+                            _note_miss(cache_key, time.perf_counter() - started)
+                        _store(cache_key, value)
+                    else:
+                        _note_hit()
+                    return value
+
+                result = await _single_flight.arun(cache_key, _compute)
+                if not leader:
+                    stats.record(coalesced=1)
+                    record_cache_event(hit=True)
+                return result
+
+            return async_wrapper
 
         @wraps(func)
         def wrapper(*args, **kwargs):
             cache_key = _get_cache_key(func_name, *args, **kwargs)
 
             # Try to get from cache
-            if dc is not None:
-                # diskcache with TTL
-                cached_result = cache_backend.get(cache_key, default=None)
-                if cached_result is not None:
-                    return cached_result
-            else:
-                # Memory cache (simple dict)
-                if cache_key in cache_backend:
-                    cached_data = cache_backend[cache_key]
-                    # Simple TTL check (store timestamp)
-                    import time
-                    if time.time() - cached_data.get("timestamp", 0) < ttl:
-                        return cached_data.get("value")
-                    else:
-                        del cache_backend[cache_key]
+            result = _lookup(cache_key)
+            if result is not _MISS:
+                _note_hit()
+                return result
 
-            # Cache miss - execute function
-            result = func(*args, **kwargs)
+            leader = []
 
-            # Store in cache
-            if dc is not None:
-                cache_backend.set(cache_key, result, expire=ttl)
-            else:
-                import time
-                # Clean old entries if cache is too large
-                if len(cache_backend) >= max_size:
-                    # Remove oldest 20% of entries
-                    sorted_items = sorted(
-                        cache_backend.items(), key=lambda x: x[1].get("timestamp", 0)
-                    )
-                    for key, _ in sorted_items[: max_size // 5]:
-                        del cache_backend[key]
-                cache_backend[cache_key] = {"value": result, "timestamp": time.time()}
+            # Cache miss - execute function once for all concurrent callers
+            def _compute():
+                leader.append(True)
+                # Re-check: the previous leader may have just stored it
+                value = _lookup(cache_key)
+                if value is _MISS:
+                    record_cache_event(hit=False)
+                    started = time.perf_counter()
+                    try:
+                        value = func(*args, **kwargs)
+                    finally:
+                        _note_miss(cache_key, time.perf_counter() - started)
+                    _store(cache_key, value)
+                else:
+                    _note_hit()
+                return value
 
+            result = _single_flight.run(cache_key, _compute)
+            if not leader:
+                stats.record(coalesced=1)
+                record_cache_event(hit=True)
             return result
 
         return wrapper
@@ -97,21 +455,38 @@ def clear_cache():
         cache = get_cache_backend()
         cache.clear()
     else:
-        _memory_cache.clear()
+        for memory_cache in _memory_caches.values():
+            memory_cache.clear()
+    # Keys removed by the clear are not evictions when they miss later
+    for recent_keys in _recent_keys.values():
+        recent_keys.clear()
 
 
 def get_cache_stats() -> dict:
-    """Get cache statistics."""
+    """Get cache statistics, including per-function hit/miss counters."""
+    functions = {name: st.as_dict() for name, st in _function_stats.items()}
     if dc is not None:
         cache = get_cache_backend()
         return {
             "type": "diskcache",
+            "directory": cache.directory,
             "size": len(cache),
-            "size_limit_mb": 100,
+            "volume_bytes": cache.volume(),
+            "size_limit_mb": round(cache.size_limit / (1024 * 1024), 1),
+            "functions": functions,
         }
+    for name, memory_cache in _memory_caches.items():
+        functions.setdefault(name, _FunctionStats().as_dict()).update(
+            {
+                "size": len(memory_cache),
+                "max_size": memory_cache.max_size,
+                "bytes": memory_cache.bytes,
+                "max_bytes": memory_cache.max_bytes,
+                "evictions": memory_cache.evictions,
+            }
+        )
     return {
         "type": "memory",
-        "size": len(_memory_cache),
-        "max_size": 1000,
+        "size": sum(len(c) for c in _memory_caches.values()),
+        "functions": functions,
     }
-
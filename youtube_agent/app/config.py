@@ -1,52 +1,141 @@
 import logging
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
-from dotenv import load_dotenv
 
+_ENV_LOADED = False
 
-# Load .env if present (local dev)
-# Handle encoding issues gracefully
-try:
-    load_dotenv(encoding="utf-8")
-except (UnicodeDecodeError, Exception):
-    # Try without encoding or skip if file is corrupted
+
+def load_env() -> None:
+    """
+    Load .env if present (local dev), once per process. Runs on the first
+    settings read rather than at import; code that reads os.environ directly
+    calls it first. Existing environment variables win over the file.
+    """
+    global _ENV_LOADED
+    if _ENV_LOADED:
+        return
+    _ENV_LOADED = True
+    from dotenv import load_dotenv
+
+    # Handle encoding issues gracefully
     try:
-        load_dotenv()
-    except Exception:
-        # If .env file has issues, continue without it (use env vars directly)
-        pass
+        load_dotenv(encoding="utf-8")
+    except (UnicodeDecodeError, Exception):
+        # Try without encoding or skip if file is corrupted
+        try:
+            load_dotenv()
+        except Exception:
+            # If .env file has issues, continue without it (use env vars directly)
+            pass
+
+
+def _getenv(name: str, default: Optional[str] = None) -> Optional[str]:
+    load_env()
+    return os.getenv(name, default)
+
+
+def _env(name: str, default: Optional[str] = None):
+    """Read an environment variable when Settings is instantiated, not at import."""
+    return field(default_factory=lambda: _getenv(name, default))
+
+
+def _env_int(name: str, default: int):
+    """Integer variant of _env()."""
+    return field(default_factory=lambda: int(_getenv(name, str(default))))
+
+
+def _env_float(name: str, default: float):
+    """Float variant of _env()."""
+    return field(default_factory=lambda: float(_getenv(name, str(default))))
 
 
 @dataclass
 class Settings:
     # Provider: groq | openai | ollama | bytez | cerebras
-    provider: str = os.getenv("LLM_PROVIDER", "groq").lower()
+    provider: str = field(default_factory=lambda: _getenv("LLM_PROVIDER", "groq").lower())
 
     # Common
-    model_name: str = os.getenv("LLM_MODEL", "llama-3.3-70b-versatile")
+    model_name: str = _env("LLM_MODEL", "llama-3.3-70b-versatile")
 
     # Groq
-    groq_api_key: Optional[str] = os.getenv("GROQ_API_KEY")
+    groq_api_key: Optional[str] = _env("GROQ_API_KEY")
 
     # OpenAI (optional fallback)
-    openai_api_key: Optional[str] = os.getenv("OPENAI_API_KEY")
-    openai_model: Optional[str] = os.getenv("OPENAI_MODEL")
+    openai_api_key: Optional[str] = _env("OPENAI_API_KEY")
+    openai_model: Optional[str] = _env("OPENAI_MODEL")
 
     # Ollama (local optional)
-    ollama_model: str = os.getenv("OLLAMA_MODEL", "llama3.2")
-    ollama_base_url: str = os.getenv("OLLAMA_BASE_URL", "http://localhost:11434")
+    ollama_model: str = _env("OLLAMA_MODEL", "llama3.2")
+    ollama_base_url: str = _env("OLLAMA_BASE_URL", "http://localhost:11434")
 
     # Bytez (OpenAI-compatible gateway)
-    bytez_api_key: Optional[str] = os.getenv("BYTEZ_API_KEY")
+    bytez_api_key: Optional[str] = _env("BYTEZ_API_KEY")
     # Default to OpenAI-compatible path used by Bytez gateways
-    bytez_base_url: Optional[str] = os.getenv("BYTEZ_BASE_URL", "https://api.bytez.com/openai/v1")
+    bytez_base_url: Optional[str] = _env("BYTEZ_BASE_URL", "https://api.bytez.com/openai/v1")
 
     # Cerebras Cloud (OpenAI-compatible API)
     # Correct endpoint: https://api.cerebras.ai/v1 (not cloud.cerebras.ai)
-    cerebras_api_key: Optional[str] = os.getenv("CEREBRAS_API_KEY")
-    cerebras_base_url: Optional[str] = os.getenv("CEREBRAS_BASE_URL", "https://api.cerebras.ai/v1")
+    cerebras_api_key: Optional[str] = _env("CEREBRAS_API_KEY")
+    cerebras_base_url: Optional[str] = _env("CEREBRAS_BASE_URL", "https://api.cerebras.ai/v1")
+
+    # Tool result cache (diskcache directory shared by the whole process)
+    cache_dir: str = _env("CACHE_DIR", "./.cache")
+    cache_size_limit_mb: int = _env_int("CACHE_SIZE_LIMIT_MB", 100)
+    # SQLite full-text index of fetched transcripts; "" = transcripts.sqlite3 in CACHE_DIR
+    transcript_index_path: str = _env("TRANSCRIPT_INDEX_PATH", "")
+
+    # Agent execution
+    # Threads used to run blocking tool libraries (yt-dlp, pytube, transcripts)
+    # off the event loop; shared by every in-flight query in the process.
+    tool_max_workers: int = _env_int("TOOL_MAX_WORKERS", 32)
+    # Max tool calls from a single model turn that run at the same time.
+    max_parallel_tools: int = _env_int("MAX_PARALLEL_TOOLS", 4)
+    # Prompt token budget per LLM call; 0 uses the provider default in context.py
+    prompt_token_budget: int = _env_int("PROMPT_TOKEN_BUDGET", 0)
+    # Guards for one agent run; when one trips the model is asked to answer now
+    agent_max_tool_rounds: int = _env_int("AGENT_MAX_TOOL_ROUNDS", 8)
+    agent_deadline_seconds: int = _env_int("AGENT_DEADLINE_SECONDS", 90)
+    agent_max_tokens: int = _env_int("AGENT_MAX_TOKENS", 60000)
+
+    # Reusable yt-dlp extractors (see ydl_pool.py)
+    ytdlp_pool_size: int = _env_int("YTDLP_POOL_SIZE", 8)  # max instances alive at once
+    ytdlp_pool_max_uses: int = _env_int("YTDLP_POOL_MAX_USES", 100)  # borrows before recycling
+    ytdlp_pool_max_age: int = _env_int("YTDLP_POOL_MAX_AGE", 900)  # seconds before recycling
+    ytdlp_pool_prewarm: int = _env_int("YTDLP_POOL_PREWARM", 0)  # "full" instances built at startup
+
+    # Shared keep-alive HTTP session for pytube and the transcript API (see
+    # http_session.py); yt-dlp extractors take only the read timeout
+    http_pool_size: int = _env_int("HTTP_POOL_SIZE", 32)  # connections kept per host
+    http_connect_timeout: float = _env_float("HTTP_CONNECT_TIMEOUT", 5)  # seconds
+    http_read_timeout: float = _env_float("HTTP_READ_TIMEOUT", 20)  # seconds
+
+    # Trending snapshots (see trending.py): comma-separated regions the API
+    # server refreshes in the background ("" = none; other regions are
+    # fetched on first request), and how often snapshots are refreshed
+    trending_regions: str = _env("TRENDING_REGIONS", "")
+    trending_refresh_seconds: int = _env_int("TRENDING_REFRESH_SECONDS", 900)
+
+    # Concurrent item fetches inside one bulk tool call (get_metadata_batch, ...)
+    bulk_max_parallel: int = _env_int("BULK_MAX_PARALLEL", 8)
+
+    # Long-transcript summarization (map-reduce)
+    summary_chunk_tokens: int = _env_int("SUMMARY_CHUNK_TOKENS", 1500)
+    summary_max_parallel: int = _env_int("SUMMARY_MAX_PARALLEL", 4)
+
+    # Whole-query response cache (0 disables it)
+    response_cache_ttl: int = _env_int("RESPONSE_CACHE_TTL", 3600)
+    # Optional near-duplicate lookup by embedding similarity: "" (off) | openai | ollama
+    response_cache_embeddings: str = _env("RESPONSE_CACHE_EMBEDDINGS", "")
+    response_cache_embedding_model: Optional[str] = _env("RESPONSE_CACHE_EMBEDDING_MODEL")
+    response_cache_similarity: float = _env_float("RESPONSE_CACHE_SIMILARITY", 0.92)
+
+    # /batch execution
+    batch_concurrency: int = _env_int("BATCH_CONCURRENCY", 4)
+    batch_query_timeout: int = _env_int("BATCH_QUERY_TIMEOUT", 120)  # seconds per query
+    batch_rate_limit_retries: int = _env_int("BATCH_RATE_LIMIT_RETRIES", 3)
+    batch_rate_limit_backoff: int = _env_int("BATCH_RATE_LIMIT_BACKOFF", 2)  # base seconds
 
 
 def get_settings() -> Settings:
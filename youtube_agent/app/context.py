@@ -0,0 +1,110 @@
+"""Prompt token budgeting for the agent's growing message history."""
+
+import json
+from typing import Any, List
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from .config import Settings
+from .tokens import CHARS_PER_TOKEN, estimate_tokens
+
+
+# Default prompt budgets per provider (tokens per LLM call, messages only).
+# They sit well under each provider's context window and, for the free tiers,
+# under the tokens-per-minute quota so a single query cannot exhaust it.
+PROVIDER_PROMPT_BUDGETS = {
+    "groq": 8000,
+    "cerebras": 30000,
+    "bytez": 30000,
+    "openai": 100000,
+    "ollama": 8000,
+}
+DEFAULT_PROMPT_BUDGET = 16000
+
+# Over budget, outputs of earlier tool rounds are first cut to this preview
+COMPACTED_TOOL_CHARS = 600
+# Never shrink an unread tool output below this, even when over budget
+MIN_TOOL_TOKENS = 150
+
+# Per-message overhead for role and framing tokens
+_MESSAGE_OVERHEAD_TOKENS = 4
+# Tokens taken by the "characters omitted" note appended by _compact()
+_COMPACT_NOTE_TOKENS = 30
+
+
+def prompt_budget(settings: Settings) -> int:
+    """Prompt token budget for the configured provider (PROMPT_TOKEN_BUDGET overrides)."""
+    if settings.prompt_token_budget > 0:
+        return settings.prompt_token_budget
+    return PROVIDER_PROMPT_BUDGETS.get(settings.provider, DEFAULT_PROMPT_BUDGET)
+
+
+def message_tokens(message: Any) -> int:
+    """Estimated prompt tokens for one message, including any tool-call arguments."""
+    content = getattr(message, "content", "")
+    if not isinstance(content, str):
+        content = json.dumps(content, default=str)
+    tokens = estimate_tokens(content) + _MESSAGE_OVERHEAD_TOKENS
+    for tool_call in getattr(message, "tool_calls", None) or []:
+        tokens += estimate_tokens(tool_call["name"] + json.dumps(tool_call["args"], default=str))
+    return tokens
+
+
+def count_tokens(messages: List[Any]) -> int:
+    return sum(message_tokens(m) for m in messages)
+
+
+def _compact(message: ToolMessage, max_chars: int) -> ToolMessage:
+    content = message.content if isinstance(message.content, str) else str(message.content)
+    if len(content) <= max_chars:
+        return message
+    preview = content[:max_chars]
+    return ToolMessage(
+        content=(
+            f"{preview} ... [{len(content) - max_chars} more characters omitted to save "
+            "context; call the tool again if you need them]"
+        ),
+        tool_call_id=message.tool_call_id,
+    )
+
+
+def fit_messages(messages: List[Any], budget: int) -> List[Any]:
+    """
+    Return a copy of messages that fits within budget tokens.
+
+    Message order and tool_call/ToolMessage pairing are preserved; only tool
+    output content shrinks, and only when the prompt is over budget. First,
+    outputs of earlier tool rounds (anything before the last AI message) are
+    cut to a short preview, oldest first, until the prompt fits. If it still
+    does not, the largest remaining tool outputs are trimmed until it fits
+    or they reach MIN_TOOL_TOKENS.
+    """
+    fitted = list(messages)
+    over = count_tokens(fitted) - budget
+    if over <= 0:
+        return fitted
+
+    last_ai = max((i for i, m in enumerate(fitted) if isinstance(m, AIMessage)), default=-1)
+    for i in range(last_ai):
+        if isinstance(fitted[i], ToolMessage):
+            before = message_tokens(fitted[i])
+            fitted[i] = _compact(fitted[i], COMPACTED_TOOL_CHARS)
+            over -= before - message_tokens(fitted[i])
+            if over <= 0:
+                return fitted
+
+    tool_indices = sorted(
+        (i for i, m in enumerate(fitted) if isinstance(m, ToolMessage)),
+        key=lambda i: message_tokens(fitted[i]),
+        reverse=True,
+    )
+    for i in tool_indices:
+        before = message_tokens(fitted[i])
+        keep = max(MIN_TOOL_TOKENS, before - over - _COMPACT_NOTE_TOKENS)
+        if keep >= before:
+            continue
+        fitted[i] = _compact(fitted[i], keep * CHARS_PER_TOKEN)
+        over -= before - message_tokens(fitted[i])
+        if over <= 0:
+            break
+    return fitted
@@ -0,0 +1,119 @@
+"""
+Shared keep-alive HTTP session for the tool backends.
+
+pytube opens a new urllib connection for every request and
+YouTubeTranscriptApi creates its own requests.Session per instance, so each
+tool call used to pay a fresh TCP and TLS handshake to YouTube. Both now go
+through one requests.Session whose connection pool is shared by every tool
+thread in the process. yt-dlp keeps its own sessions inside each pooled
+extractor (see ydl_pool.py) and only takes the timeout from here.
+
+requests speaks HTTP/1.1 only; HTTP/2 would need a different client, which
+neither pytube nor youtube-transcript-api can be given.
+"""
+
+import json
+import threading
+from typing import Optional
+from urllib.error import HTTPError
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import Settings
+
+
+class _TimeoutAdapter(HTTPAdapter):
+    """HTTPAdapter that applies a default (connect, read) timeout to every request."""
+
+    def __init__(self, timeout, **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        return super().send(request, **kwargs)
+
+
+_SESSION: Optional[requests.Session] = None
+_SESSION_LOCK = threading.Lock()
+_PYTUBE_PATCHED = False
+
+
+def build_http_session(settings: Settings) -> requests.Session:
+    session = requests.Session()
+    adapter = _TimeoutAdapter(
+        timeout=(settings.http_connect_timeout, settings.http_read_timeout),
+        pool_connections=4,  # distinct hosts kept (youtube.com, www., i.ytimg.com, ...)
+        pool_maxsize=settings.http_pool_size,  # connections kept per host
+        # Only failed connects are retried; a read may already have reached YouTube
+        max_retries=Retry(total=2, read=0, backoff_factor=0.2),
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def get_http_session() -> requests.Session:
+    """The process-wide session, built on first use."""
+    global _SESSION
+    if _SESSION is None:
+        with _SESSION_LOCK:
+            if _SESSION is None:
+                _SESSION = build_http_session(Settings())
+    return _SESSION
+
+
+class _PytubeResponse:
+    """The slice of urllib's response object that pytube uses: read() and info()."""
+
+    def __init__(self, response: requests.Response):
+        self._response = response
+
+    def read(self, amt: Optional[int] = None) -> bytes:
+        if amt is None:
+            return self._response.content
+        return self._response.raw.read(amt, decode_content=True)
+
+    def info(self):
+        return self._response.headers
+
+
+def _pytube_execute_request(url, method=None, headers=None, data=None, timeout=None):
+    """Drop-in for pytube.request._execute_request that uses the shared session."""
+    base_headers = {"User-Agent": "Mozilla/5.0", "accept-language": "en-US,en"}
+    if headers:
+        base_headers.update(headers)
+    if data and not isinstance(data, bytes):
+        data = bytes(json.dumps(data), encoding="utf-8")
+    if not url.lower().startswith("http"):
+        raise ValueError("Invalid URL")
+    if not isinstance(timeout, (int, float)):
+        # socket._GLOBAL_DEFAULT_TIMEOUT: let the adapter apply its default
+        timeout = None
+    response = get_http_session().request(
+        method or ("POST" if data else "GET"),
+        url,
+        headers=base_headers,
+        data=data,
+        timeout=timeout,
+        stream=True,
+    )
+    if response.status_code >= 400:
+        # pytube's callers expect urllib's exception for HTTP errors
+        response.close()
+        raise HTTPError(url, response.status_code, response.reason, response.headers, None)
+    return _PytubeResponse(response)
+
+
+def install_pytube_session() -> None:
+    """Route pytube's requests through the shared session (idempotent)."""
+    global _PYTUBE_PATCHED
+    if _PYTUBE_PATCHED:
+        return
+    from pytube import request as pytube_request
+
+    pytube_request._execute_request = _pytube_execute_request
+    _PYTUBE_PATCHED = True
@@ -0,0 +1,121 @@
+"""
+Import-time profiler for cold starts.
+
+`python -X importtime` cannot be switched on from inside an interpreter that
+a serverless runtime has already started, so this times module execution
+with a meta path hook instead:
+
+    with ImportProfiler() as profile:
+        from youtube_agent.app.api import app
+    print(profile.report(budget_ms=1500), file=sys.stderr)
+
+Only the standard library is imported here, so the profiler itself adds
+nothing to the numbers it reports.
+"""
+
+import sys
+import time
+from importlib.machinery import ExtensionFileLoader, SourceFileLoader, SourcelessFileLoader
+from typing import Dict, List, Optional, Tuple
+
+# Loaders created once per module; shared loaders (zipimport, builtin,
+# frozen) are left alone so one module's timer is never reused for another
+_PER_MODULE_LOADERS = (SourceFileLoader, SourcelessFileLoader, ExtensionFileLoader)
+
+
+class ImportProfiler:
+    """
+    Records the cumulative and self execution time of every module first
+    imported while the profiler is active. Modules that were already in
+    sys.modules cost nothing and are not listed. Meant for single-threaded
+    startup code; imports from other threads at the same time would be
+    attributed to whichever module is on top of the stack.
+    """
+
+    def __init__(self):
+        # module name -> (cumulative, self) seconds
+        self.timings: Dict[str, Tuple[float, float]] = {}
+        self.total = 0.0
+        self._stack: List[List[float]] = []  # [start, time spent in children]
+        self._active = False
+        self._started = 0.0
+
+    def __enter__(self) -> "ImportProfiler":
+        self._active = True
+        self._started = time.perf_counter()
+        sys.meta_path.insert(0, self)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.total = time.perf_counter() - self._started
+        self._active = False
+        try:
+            sys.meta_path.remove(self)
+        except ValueError:
+            pass
+
+    def find_spec(self, name, path=None, target=None):
+        """Meta path hook: find the spec with the remaining finders and time its loader."""
+        if not self._active:
+            return None
+        for finder in list(sys.meta_path):
+            if finder is self or not hasattr(finder, "find_spec"):
+                continue
+            spec = finder.find_spec(name, path, target)
+            if spec is not None:
+                self._wrap(spec)
+                return spec
+        return None
+
+    def _wrap(self, spec) -> None:
+        loader = spec.loader
+        if not isinstance(loader, _PER_MODULE_LOADERS):
+            return
+        exec_module = loader.exec_module
+        name = spec.name
+
+        def timed_exec_module(module):
+            if not self._active:
+                return exec_module(module)
+            frame = [time.perf_counter(), 0.0]
+            self._stack.append(frame)
+            try:
+                exec_module(module)
+            finally:
+                self._stack.pop()
+                elapsed = time.perf_counter() - frame[0]
+                self.timings[name] = (elapsed, elapsed - frame[1])
+                if self._stack:
+                    self._stack[-1][1] += elapsed
+
+        loader.exec_module = timed_exec_module
+
+    def by_package(self) -> Dict[str, float]:
+        """Self time summed per top-level package, in seconds."""
+        totals: Dict[str, float] = {}
+        for name, (_, own) in self.timings.items():
+            package = name.partition(".")[0]
+            totals[package] = totals.get(package, 0.0) + own
+        return totals
+
+    def report(self, top: int = 12, budget_ms: Optional[float] = None) -> str:
+        """
+        Plain-text summary: total time, the slowest top-level packages and the
+        slowest individual modules (by self time). With budget_ms, a final
+        line says whether the imports fit in it.
+        """
+        lines = [f"Import profile: {self.total * 1000:.0f} ms, {len(self.timings)} modules"]
+        lines.append("  slowest packages (self ms):")
+        packages = sorted(self.by_package().items(), key=lambda item: item[1], reverse=True)
+        lines += [f"    {own * 1000:8.1f}  {name}" for name, own in packages[:top]]
+        lines.append("  slowest modules (cumulative ms / self ms):")
+        modules = sorted(self.timings.items(), key=lambda item: item[1][1], reverse=True)
+        lines += [
+            f"    {cumulative * 1000:8.1f} / {own * 1000:6.1f}  {name}"
+            for name, (cumulative, own) in modules[:top]
+        ]
+        if budget_ms:
+            elapsed_ms = self.total * 1000
+            verdict = "within" if elapsed_ms <= budget_ms else "OVER"
+            lines.append(f"  cold-start budget: {elapsed_ms:.0f} ms {verdict} {budget_ms:.0f} ms")
+        return "\n".join(lines)
@@ -0,0 +1,126 @@
+"""Chat model construction and the process-wide client registry."""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from .config import Settings, get_settings
+
+
+# Chat models keyed by (provider, model). Each one owns an HTTP connection pool,
+# so the agent chain and the summarizer share a single client per process.
+_MODEL_REGISTRY: Dict[Tuple[str, str], Any] = {}
+_MODEL_REGISTRY_LOCK = threading.Lock()
+
+# Embedding client for the response cache's similarity lookup, built on first use
+_EMBEDDINGS: Dict[Tuple[str, str], Any] = {}
+
+
+def resolve_model_name(settings: Settings) -> str:
+    """Return the model name that will actually be used for the configured provider."""
+    if settings.provider == "groq":
+        return settings.model_name
+    if settings.provider == "openai":
+        return settings.openai_model or settings.model_name
+    if settings.provider == "bytez":
+        return settings.model_name if settings.model_name else "gpt-4o-mini"
+    if settings.provider == "cerebras":
+        return settings.model_name or "gpt-oss-120b"
+    return settings.ollama_model
+
+
+def build_chat_model(settings: Settings):
+    if settings.provider == "groq":
+        # Use Groq (free tier available)
+        from langchain_groq import ChatGroq
+
+        llm = ChatGroq(model=settings.model_name, api_key=settings.groq_api_key)
+    elif settings.provider == "openai":
+        from langchain_openai import ChatOpenAI
+
+        model_name = settings.openai_model or settings.model_name
+        llm = ChatOpenAI(model=model_name, api_key=settings.openai_api_key)
+    elif settings.provider == "bytez":
+        # Bytez is OpenAI-compatible; use ChatOpenAI with base_url and key
+        from langchain_openai import ChatOpenAI
+
+        # Default to gpt-4o-mini when provider is Bytez if not explicitly set
+        model_name = settings.model_name if settings.model_name else "gpt-4o-mini"
+        llm = ChatOpenAI(
+            model=model_name,
+            api_key=settings.bytez_api_key,
+            base_url=settings.bytez_base_url,
+        )
+    elif settings.provider == "cerebras":
+        # Cerebras Cloud: OpenAI-compatible endpoint at https://api.cerebras.ai/v1
+        # Supports tool calling via ChatOpenAI wrapper
+        from langchain_openai import ChatOpenAI
+
+        # Default model: gpt-oss-120b (as per Cerebras API documentation)
+        # Available models: gpt-oss-120b, llama-3.3-70b, etc.
+        model_name = settings.model_name or "gpt-oss-120b"
+        llm = ChatOpenAI(
+            model=model_name,
+            api_key=settings.cerebras_api_key,
+            base_url=settings.cerebras_base_url,
+        )
+    else:
+        # Fallback to Ollama if chosen
+        from langchain.chat_models import init_chat_model
+
+        llm = init_chat_model(
+            settings.ollama_model,
+            model_provider="ollama",
+        )
+    return llm
+
+
+def get_chat_model(settings: Optional[Settings] = None):
+    """Return the shared (tool-less) chat model for the configured provider and model."""
+    settings = settings or get_settings()
+    key = (settings.provider, resolve_model_name(settings))
+    llm = _MODEL_REGISTRY.get(key)
+    if llm is None:
+        with _MODEL_REGISTRY_LOCK:
+            llm = _MODEL_REGISTRY.get(key)
+            if llm is None:
+                llm = build_chat_model(settings)
+                _MODEL_REGISTRY[key] = llm
+    return llm
+
+
+def build_embeddings(settings: Settings):
+    """Embedding model for RESPONSE_CACHE_EMBEDDINGS, or None when it is off."""
+    provider = settings.response_cache_embeddings.lower()
+    if provider == "openai":
+        from langchain_openai import OpenAIEmbeddings
+
+        return OpenAIEmbeddings(
+            model=settings.response_cache_embedding_model or "text-embedding-3-small",
+            api_key=settings.openai_api_key,
+        )
+    if provider == "ollama":
+        from langchain_ollama import OllamaEmbeddings
+
+        return OllamaEmbeddings(
+            model=settings.response_cache_embedding_model or "nomic-embed-text",
+            base_url=settings.ollama_base_url,
+        )
+    return None
+
+
+def get_embeddings(settings: Optional[Settings] = None):
+    """Return the shared embedding model, or None when similarity lookup is off."""
+    settings = settings or get_settings()
+    key = (settings.response_cache_embeddings, settings.response_cache_embedding_model or "")
+    if key not in _EMBEDDINGS:
+        with _MODEL_REGISTRY_LOCK:
+            if key not in _EMBEDDINGS:
+                _EMBEDDINGS[key] = build_embeddings(settings)
+    return _EMBEDDINGS[key]
+
+
+def reload_chat_models() -> None:
+    """Drop cached chat and embedding models so the next call rebuilds them from current settings."""
+    with _MODEL_REGISTRY_LOCK:
+        _MODEL_REGISTRY.clear()
+        _EMBEDDINGS.clear()
@@ -19,15 +19,23 @@ You are a powerful AI agent specialized in YouTube analysis and synthesis. Your
 
 5) TOOL USAGE RULES:
    • Validate user input (is it a URL, id, or search query?). If ambiguous, ask one concise clarifying question.
-   • If transcript length exceeds token limits, use truncate_text to chunk it, then synthesize a final summary from chunks.
+   • To summarize a whole video, call summarize_transcript(video_id) — it handles transcripts of any length. Do not try to chunk transcripts yourself with truncate_text.
+   • When a request involves several videos (compare, rank, a playlist), fetch them together with get_metadata_batch / fetch_transcripts_batch in one call instead of one call per video.
+   • To find which videos (or which moments) mention something, try search_transcripts first: it searches transcripts already fetched without reading them into the conversation.
+   • Long transcripts from fetch_transcript come back as the first chunk plus a chunk count. Read further parts with get_transcript_window (by chunk_index or by start/end seconds) only when you need specific details.
    • If a tool returns an error or no transcript, report the error and suggest a fallback (e.g., search for similar videos).
    • Available tools:
      - extract_video_id(url): Extracts 11-character video ID from YouTube URL
-     - search_youtube(query): Searches YouTube, returns list with title, video_id, url
-     - fetch_transcript(video_id, language="en"): Returns transcript text or error
+     - search_youtube(query, max_results=5, page=1, fields, min_duration_minutes, max_duration_minutes, uploaded_within_days): Searches YouTube, returns list with title, video_id, url (+ requested fields: channel, duration, views, published). Request only as many results and fields as the answer needs
+     - fetch_transcript(video_id, language="en"): Returns transcript text (or first chunk + chunk count for long videos) or error
+     - get_transcript_window(video_id, start_seconds, end_seconds, chunk_index, language="en"): Returns one timestamped part of a transcript
      - get_full_metadata(url): Returns comprehensive metadata (title, views, duration, channel, likes, comments, chapters)
-     - get_trending_videos(region_code): Fetches trending videos for region (may have restrictions)
+     - get_trending_videos(region_code): Trending videos for region from a periodically refreshed snapshot; mention its age when it is more than an hour old
      - get_thumbnails(url): Retrieves available thumbnails
+     - summarize_transcript(video_id, focus="", language="en"): Summarizes the complete transcript (map-reduce), with timestamps
+     - get_metadata_batch(urls): Compact metadata for up to 20 videos at once, with per-video errors
+     - fetch_transcripts_batch(video_ids, language="en", max_chars_per_video=3000): Transcript openings for up to 20 videos at once
+     - search_transcripts(query, video_ids=None, max_results=10): Searches inside already fetched transcripts; returns video_id, timestamp, snippet and a timestamped url per match, plus not_indexed videos
      - truncate_text(text, max_chars=3000): Utility to truncate long text
 
 6) SAFETY & COPYRIGHT:
@@ -64,3 +72,29 @@ You are a powerful AI agent specialized in YouTube analysis and synthesis. Your
    • Keep the tone factual and concise.
 
 End system instructions."""
+
+
+CHUNK_SUMMARY_PROMPT = """Summarize this part of a YouTube video transcript in at most 120 words.
+Keep concrete facts, names, numbers and claims. Keep the [m:ss] timestamp of each key moment you mention.
+Do not add information that is not in the text.
+
+Transcript part:
+{text}"""
+
+
+COMBINE_SUMMARY_PROMPT = """Below are summaries of consecutive parts of one YouTube video, in order.
+Merge them into a single summary of at most {max_words} words. Keep [m:ss] timestamps for key moments and drop repetition.
+{focus}
+Part summaries:
+{text}"""
+
+
+FINALIZE_PROMPT = """Stop calling tools: the agent {reason}.
+Using only the tool results above, give your best final answer now, in the usual response format.
+If something could not be checked, say so in one short line."""
+
+
+GUARD_FALLBACK_RESPONSE = (
+    "I couldn't finish gathering information for this request within my limits. "
+    "Try a more specific question or a single video URL."
+)
@@ -0,0 +1,211 @@
+"""Whole-query response cache keyed on the normalized query."""
+
+import asyncio
+import hashlib
+import math
+import re
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, List, Optional, Set, Tuple
+
+from langchain_core.messages import HumanMessage, ToolMessage
+
+from .cache import get_named_cache, record_lookup
+from .config import Settings, get_settings
+from .llm import get_embeddings, resolve_model_name
+from .tools.summarize import parse_video_id
+from .tracing import RESPONSE_CACHE_LOOKUPS, is_tool_error
+
+
+_CACHE_NAME = "response_cache"
+
+# Punctuation peeled off tokens before URL/ID detection ("(https://youtu.be/x)?")
+_TOKEN_PUNCTUATION = "\"'()[]<>,.!?;:"
+_VIDEO_TOKEN = re.compile(r"video:(\S+)")
+_ID_LIKE = re.compile(r"[A-Za-z0-9_-]{11}")
+# A bare ID right after one of these words is always taken as an ID ("video XYZ")
+_ID_CONTEXT_WORDS = {"video", "id", "video_id", "vid", "v"}
+# Queries with one of these words are searches: their other bare tokens are
+# search terms ("python-tips", "full-course"), not IDs
+_SEARCH_WORDS = {"search", "searching", "find", "look", "lookup"}
+
+# Similarity lookups compare against at most this many recent queries
+_SEMANTIC_INDEX_SIZE = 500
+
+
+def _normalize_token(token: str, bare_ids: bool) -> str:
+    stripped = token.strip(_TOKEN_PUNCTUATION)
+    if "youtu" in stripped.lower():
+        video_id = parse_video_id(stripped)
+        if video_id:
+            return f"video:{video_id}"
+    # Bare IDs are case-sensitive; only treat 11-char tokens that look like one
+    # (a digit, "-"/"_", or capitals past the first letter) as IDs so ordinary
+    # words, including capitalized ones, still fold
+    if (
+        bare_ids
+        and _ID_LIKE.fullmatch(stripped)
+        and not stripped.isdigit()
+        and (
+            not stripped.isalpha()
+            or (stripped[1:] != stripped[1:].lower() and stripped != stripped.upper())
+        )
+    ):
+        return f"video:{stripped}"
+    return token.lower()
+
+
+def normalize_query(query: str) -> str:
+    """
+    Canonical form of a query: video URLs become video:<id>, everything else
+    is lowercased, whitespace is collapsed and trailing punctuation dropped.
+    Bare IDs count too, except in searches where only one following "video"
+    or "id" does.
+
+        "Summarize  https://youtu.be/dQw4w9WgXcQ?si=x " -> "summarize video:dQw4w9WgXcQ"
+    """
+    tokens = query.split()
+    words = [t.strip(_TOKEN_PUNCTUATION).lower() for t in tokens]
+    search = any(word in _SEARCH_WORDS for word in words)
+    normalized = " ".join(
+        _normalize_token(token, not search or (i > 0 and words[i - 1] in _ID_CONTEXT_WORDS))
+        for i, token in enumerate(tokens)
+    )
+    return normalized.rstrip(" .!?;:,")
+
+
+def video_ids(normalized: str) -> frozenset:
+    """IDs of the videos a normalized query refers to."""
+    return frozenset(_VIDEO_TOKEN.findall(normalized))
+
+
+def _cache_key(settings: Settings, normalized: str) -> str:
+    # Answers depend on the model, so each provider/model has its own entries
+    model = f"{settings.provider}:{resolve_model_name(settings)}"
+    return "response:" + hashlib.md5(f"{model}\n{normalized}".encode()).hexdigest()
+
+
+def is_cacheable(messages: List[Any]) -> bool:
+    """
+    True when an agent run finished normally: no guard had to force the
+    answer (which adds a second user message) and no tool call failed, so
+    the answer is not built around a transient error.
+    """
+    if sum(isinstance(m, HumanMessage) for m in messages) != 1:
+        return False
+    return not any(
+        isinstance(m, ToolMessage) and is_tool_error(m.content) for m in messages
+    )
+
+
+class _SemanticIndex:
+    """Recent normalized queries with unit-length embeddings, newest last."""
+
+    def __init__(self, max_entries: int):
+        self._entries: Deque[Tuple[frozenset, List[float], str]] = deque(maxlen=max_entries)
+        self._lock = threading.Lock()
+
+    def add(self, video_ids: frozenset, vector: List[float], key: str) -> None:
+        with self._lock:
+            self._entries.append((video_ids, _unit(vector), key))
+
+    def best(self, video_ids: frozenset, vector: List[float]) -> Tuple[float, Optional[str]]:
+        """Most similar entry about exactly the same videos, as (cosine, key)."""
+        vector = _unit(vector)
+        best_score, best_key = 0.0, None
+        with self._lock:
+            candidates = [(v, k) for ids, v, k in self._entries if ids == video_ids]
+        for other, key in candidates:
+            score = sum(a * b for a, b in zip(vector, other))
+            if score > best_score:
+                best_score, best_key = score, key
+        return best_score, best_key
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+def _unit(vector: List[float]) -> List[float]:
+    norm = math.sqrt(sum(x * x for x in vector)) or 1.0
+    return [x / norm for x in vector]
+
+
+_semantic_index = _SemanticIndex(_SEMANTIC_INDEX_SIZE)
+# Embedding tasks started by store(); referenced so they are not garbage collected
+_pending: Set[asyncio.Task] = set()
+
+
+async def _embed(settings: Settings, normalized: str) -> Optional[List[float]]:
+    embeddings = get_embeddings(settings)
+    if embeddings is None:
+        return None
+    try:
+        return await embeddings.aembed_query(normalized)
+    except Exception:  # noqa: BLE001
+        # Similarity lookup is best effort; an embedding outage is just a miss
+        return None
+
+
+async def lookup(query: str) -> Optional[dict]:
+    """
+    Return the cached entry for query, or None.
+
+    Exact matches on the normalized query are tried first. With
+    RESPONSE_CACHE_EMBEDDINGS set, a near-duplicate about the same videos
+    whose similarity reaches RESPONSE_CACHE_SIMILARITY is also served.
+    Entries are dicts with query, normalized, response, created and
+    similarity (1.0 for exact matches).
+    """
+    settings = get_settings()
+    if settings.response_cache_ttl <= 0:
+        return None
+    cache = get_named_cache(_CACHE_NAME)
+    normalized = normalize_query(query)
+    entry = cache.get(_cache_key(settings, normalized))
+    if entry is not None:
+        record_lookup(_CACHE_NAME, hit=True)
+        RESPONSE_CACHE_LOOKUPS.inc(result="hit")
+        return dict(entry, similarity=1.0)
+
+    vector = await _embed(settings, normalized)
+    if vector is not None:
+        score, key = _semantic_index.best(video_ids(normalized), vector)
+        entry = cache.get(key) if key and score >= settings.response_cache_similarity else None
+        if entry is not None:
+            record_lookup(_CACHE_NAME, hit=True)
+            RESPONSE_CACHE_LOOKUPS.inc(result="similar")
+            return dict(entry, similarity=round(score, 4))
+
+    record_lookup(_CACHE_NAME, hit=False)
+    RESPONSE_CACHE_LOOKUPS.inc(result="miss")
+    return None
+
+
+async def store(query: str, response: str) -> None:
+    """Cache a final answer; its embedding (if enabled) is indexed in the background."""
+    settings = get_settings()
+    if settings.response_cache_ttl <= 0 or not response:
+        return
+    normalized = normalize_query(query)
+    key = _cache_key(settings, normalized)
+    get_named_cache(_CACHE_NAME).set(
+        key,
+        {"query": query, "normalized": normalized, "response": response, "created": time.time()},
+        expire=settings.response_cache_ttl,
+    )
+    if settings.response_cache_embeddings:
+
+        async def _index():
+            vector = await _embed(settings, normalized)
+            if vector is not None:
+                _semantic_index.add(video_ids(normalized), vector, key)
+
+        task = asyncio.create_task(_index())
+        _pending.add(task)
+        task.add_done_callback(_pending.discard)
+
+
+def clear_semantic_index() -> None:
+    _semantic_index.clear()
@@ -0,0 +1,204 @@
+"""
+Deterministic fast path for queries that map to exactly one tool call.
+
+Greetings, "metadata for <url>", "thumbnails for <url>" and "search youtube
+for X" are answered by calling the tool directly and rendering the result
+in the SYSTEM_PROMPT formats, without any LLM round-trip. Anything that does
+not match one of these patterns in full goes to the agent.
+"""
+
+import re
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+from .agent import arun_tool
+from .response_cache import normalize_query, video_ids
+from .transcripts import format_timestamp
+
+
+SIMPLE_GREETINGS = {"hi", "hello", "hey", "hola", "yo"}
+GREETING_RESPONSE = (
+    "Hello! I'm your YouTube Agent. I can search videos, fetch transcripts, "
+    "summarize content, and provide sources. Ask me about a video or topic, "
+    "e.g. 'Summarize https://youtu.be/...'"
+)
+
+# Patterns run on the normalized query with its single video replaced by VIDEO
+_POLITE = r"(?:(?:please|pls|can you|could you|would you)\s+)*"
+_ASK = r"(?:(?:get|show|give|fetch|list|display|tell)(?:\s+me)?\s+|what\s+(?:are|is)\s+|what's\s+)?"
+_ABOUT = r"(?:\s+(?:for|of|about|on|from))?(?:\s+(?:this|the))?(?:\s+video)?"
+_METADATA_NOUN = r"(?:metadata|details|info|information|stats|statistics)"
+_THUMBNAIL_NOUN = r"(?:thumbnails?|thumbnail\s+images?|cover\s+images?)"
+
+
+def _video_patterns(noun: str) -> Tuple["re.Pattern", ...]:
+    return (
+        re.compile(rf"{_POLITE}{_ASK}(?:the\s+)?(?:video\s+)?{noun}{_ABOUT}\s+VIDEO(?:\s+please)?"),
+        re.compile(rf"{_POLITE}{_ASK}(?:the\s+)?VIDEO\s+(?:video\s+)?{noun}(?:\s+please)?"),
+    )
+
+
+_METADATA_PATTERNS = _video_patterns(_METADATA_NOUN)
+_THUMBNAIL_PATTERNS = _video_patterns(_THUMBNAIL_NOUN)
+_SEARCH_PATTERN = re.compile(
+    rf"{_POLITE}(?:search\s+(?:on\s+)?(?:youtube\s+)?(?:for\s+)?"
+    r"|youtube\s+search\s+(?:for\s+)?"
+    r"|(?:find|look\s+up|show\s+me)\s+(?:youtube\s+)?videos?\s+(?:about|on|for|of)\s+)"
+    r"(?:videos?\s+(?:about|on|for)\s+)?(?P<terms>.+)"
+)
+# Search terms asking for more than a result list go to the agent
+_AGENT_WORDS = re.compile(
+    r"\b(?:and|then|also|plus|vs|versus|compare\w*|summar\w*|transcripts?|explain\w*"
+    r"|which|metadata|thumbnails?)\b"
+)
+_MAX_SEARCH_WORDS = 12
+
+
+class Route(NamedTuple):
+    intent: str
+    response: str
+
+
+def detect_intent(query: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """Return (intent, tool args) for an unambiguous query, else None."""
+    normalized = normalize_query(query)
+    if normalized in SIMPLE_GREETINGS:
+        return "greeting", {}
+    ids = video_ids(normalized)
+    text = normalized
+    for video_id in ids:
+        text = text.replace(f"video:{video_id}", "VIDEO")
+    # Internal separators ("metadata: <url>") don't change the intent
+    text = " ".join(re.sub(r"[,:;]", " ", text).split())
+    if len(ids) == 1:
+        url = f"https://youtu.be/{next(iter(ids))}"
+        if any(p.fullmatch(text) for p in _METADATA_PATTERNS):
+            return "metadata", {"url": url}
+        if any(p.fullmatch(text) for p in _THUMBNAIL_PATTERNS):
+            return "thumbnails", {"url": url}
+        return None
+    if ids:
+        return None
+    match = _SEARCH_PATTERN.fullmatch(text)
+    if match:
+        terms = match.group("terms").strip()
+        if terms and not _AGENT_WORDS.search(terms) and len(terms.split()) <= _MAX_SEARCH_WORDS:
+            return "search", {"query": terms}
+    return None
+
+
+def _cell(value: Any) -> str:
+    """Table cell text: N/A for missing values, thousands separators, no pipes."""
+    if value is None or value == "":
+        return "N/A"
+    if isinstance(value, int):
+        return f"{value:,}"
+    return str(value).replace("|", "\\|").replace("\n", " ")
+
+
+def _video_id(url: str) -> str:
+    return url.rsplit("/", 1)[-1]
+
+
+def render_metadata(url: str, metadata: Dict[str, Any]) -> str:
+    title = metadata.get("title") or "Untitled video"
+    duration = metadata.get("duration")
+    lines = [
+        f"**{title}**",
+        "",
+        "| Field | Value |",
+        "|-------|-------|",
+        f"| Channel | {_cell(metadata.get('channel'))} |",
+        f"| Views | {_cell(metadata.get('views'))} |",
+        f"| Duration | {format_timestamp(duration) if duration else 'N/A'} |",
+        f"| Likes | {_cell(metadata.get('likes'))} |",
+        f"| Comments | {_cell(metadata.get('comments'))} |",
+    ]
+    chapters = metadata.get("chapters") or []
+    if chapters:
+        lines += ["", "Key Timestamps:"]
+        lines += [
+            f"{format_timestamp(c.get('start_time') or 0)} - {c.get('title', '')}" for c in chapters
+        ]
+    lines += ["", f"Source: [{title}] (https://youtu.be/{_video_id(url)})"]
+    return "\n".join(lines)
+
+
+def render_thumbnails(url: str, thumbnails: List[Dict[str, Any]]) -> str:
+    if not thumbnails:
+        return f"No thumbnails are listed for https://youtu.be/{_video_id(url)}."
+    lines = ["| # | Resolution | URL |", "|---|------------|-----|"]
+    lines += [
+        f"| {i} | {_cell(t.get('resolution'))} | {t['url']} |"
+        for i, t in enumerate(thumbnails, start=1)
+    ]
+    lines += ["", f"Source: https://youtu.be/{_video_id(url)}"]
+    return "\n".join(lines)
+
+
+def render_search(terms: str, results: List[Dict[str, str]]) -> str:
+    if not results:
+        return (
+            f'No videos found for "{terms}". '
+            "Try broader or different keywords."
+        )
+    lines = [
+        "| # | Title | Video ID | URL | Brief Note |",
+        "|---|-------|----------|-----|------------|",
+    ]
+    lines += [
+        f"| {i} | {_cell(r['title'])} | {r['video_id']} | {r['url']} | — |"
+        for i, r in enumerate(results, start=1)
+    ]
+    return "\n".join(lines)
+
+
+def _failure(what: str, error: str, next_step: str) -> str:
+    return f"Couldn't get {what}: {error}\n\n{next_step}"
+
+
+async def _metadata(args: Dict[str, Any]) -> str:
+    try:
+        metadata = await arun_tool("get_full_metadata", args)
+    except Exception as exc:  # noqa: BLE001
+        return _failure(
+            "the video metadata",
+            str(exc),
+            "Check that the URL points to a public video, or search for it by title.",
+        )
+    return render_metadata(args["url"], metadata)
+
+
+async def _thumbnails(args: Dict[str, Any]) -> str:
+    thumbnails = await arun_tool("get_thumbnails", args)
+    if thumbnails and all("error" in t for t in thumbnails):
+        return _failure(
+            "the thumbnails",
+            thumbnails[0]["error"],
+            "Check that the URL points to a public video.",
+        )
+    return render_thumbnails(args["url"], thumbnails)
+
+
+async def _search(args: Dict[str, Any]) -> str:
+    results = await arun_tool("search_youtube", args)
+    if isinstance(results, str):
+        return _failure("search results", results, "Try again in a moment or rephrase the search.")
+    return render_search(args["query"], results)
+
+
+_HANDLERS = {
+    "metadata": _metadata,
+    "thumbnails": _thumbnails,
+    "search": _search,
+}
+
+
+async def route(query: str) -> Optional[Route]:
+    """Answer query without the LLM when its intent is unambiguous, else return None."""
+    detected = detect_intent(query)
+    if detected is None:
+        return None
+    intent, args = detected
+    if intent == "greeting":
+        return Route(intent, GREETING_RESPONSE)
+    return Route(intent, await _HANDLERS[intent](args))
@@ -0,0 +1,140 @@
+"""Map-reduce summarization for transcripts that do not fit in one prompt."""
+
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, List, Optional
+
+from .cache import cached
+from .config import get_settings
+from .llm import get_chat_model, resolve_model_name
+from .prompts import CHUNK_SUMMARY_PROMPT, COMBINE_SUMMARY_PROMPT
+from .tokens import CHARS_PER_TOKEN, estimate_tokens
+from .tools.fetch_transcript import get_transcript
+from .tracing import record_llm_call
+from .transcripts import Transcript, format_timestamp
+
+
+# Chunk LLM calls run here; the tool itself already occupies a tool-pool thread
+_SUMMARY_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_SUMMARY_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _SUMMARY_EXECUTOR
+    if _SUMMARY_EXECUTOR is None:
+        with _SUMMARY_EXECUTOR_LOCK:
+            if _SUMMARY_EXECUTOR is None:
+                _SUMMARY_EXECUTOR = ThreadPoolExecutor(
+                    max_workers=get_settings().summary_max_parallel,
+                    thread_name_prefix="youtube-agent-summary",
+                )
+    return _SUMMARY_EXECUTOR
+
+
+def _map(fn: Callable[[Any], str], items: List[Any]) -> List[str]:
+    """
+    executor.map, but each call runs in a copy of the caller's context so its
+    LLM calls land in the request trace and count against the agent's tokens.
+    """
+    executor = _get_executor()
+    futures = [executor.submit(contextvars.copy_context().run, fn, item) for item in items]
+    return [future.result() for future in futures]
+
+
+def split_transcript(transcript: Transcript, max_tokens: int) -> List[str]:
+    """Split on snippet (timestamp) boundaries into chunks of about max_tokens each."""
+    return [
+        transcript.render(first, last)
+        for first, last in transcript.chunk_bounds(max_tokens * CHARS_PER_TOKEN)
+    ]
+
+
+def _content(message) -> str:
+    content = getattr(message, "content", message)
+    return content if isinstance(content, str) else str(content)
+
+
+def _invoke(prompt: str) -> str:
+    started = time.perf_counter()
+    response = get_chat_model().invoke(prompt)
+    record_llm_call(time.perf_counter() - started, response, estimate_tokens(prompt))
+    return _content(response)
+
+
+@cached(ttl=7 * 86400)
+def _summarize_chunk(text: str, model: str) -> str:
+    # Keyed by the chunk text and model only, so a different user question
+    # over the same video reuses every chunk summary.
+    return _invoke(CHUNK_SUMMARY_PROMPT.format(text=text))
+
+
+@cached(ttl=7 * 86400)
+def _combine_summaries(text: str, focus: str, max_words: int, model: str) -> str:
+    prompt = COMBINE_SUMMARY_PROMPT.format(
+        text=text,
+        max_words=max_words,
+        focus=f"Focus on: {focus}\n" if focus else "",
+    )
+    return _invoke(prompt)
+
+
+def _group_by_budget(summaries: List[str], max_tokens: int) -> List[List[str]]:
+    """Pack consecutive summaries into groups under max_tokens, at least two per group."""
+    groups: List[List[str]] = []
+    current: List[str] = []
+    used = 0
+    for summary in summaries:
+        tokens = estimate_tokens(summary)
+        if len(current) >= 2 and used + tokens > max_tokens:
+            groups.append(current)
+            current, used = [], 0
+        current.append(summary)
+        used += tokens
+    if current:
+        # A trailing single summary joins the previous group so every round shrinks
+        if len(current) == 1 and groups:
+            groups[-1].extend(current)
+        else:
+            groups.append(current)
+    return groups
+
+
+def summarize_chunks(chunks: List[str], focus: str = "", max_words: int = 150) -> str:
+    """
+    Summarize chunks concurrently (map), then merge the summaries in rounds
+    of budget-sized groups (reduce) until one summary is left.
+    """
+    settings = get_settings()
+    model = f"{settings.provider}:{resolve_model_name(settings)}"
+
+    summaries = _map(lambda chunk: _summarize_chunk(chunk, model), chunks)
+    if len(summaries) == 1 and not focus:
+        return summaries[0]
+
+    budget = settings.summary_chunk_tokens * 2
+    while len(summaries) > 1:
+        groups = _group_by_budget(summaries, budget)
+        if len(groups) == 1:
+            break
+        summaries = _map(
+            lambda group: _combine_summaries("\n\n".join(group), "", 200, model), groups
+        )
+    return _combine_summaries("\n\n".join(summaries), focus, max_words, model)
+
+
+def summarize_video(video_id: str, focus: str = "", language: str = "en") -> dict:
+    """Summarize a video's full transcript; returns a dict with the summary or an error."""
+    transcript = get_transcript(video_id, language)
+    if isinstance(transcript, dict):
+        return transcript
+    chunks = split_transcript(transcript, get_settings().summary_chunk_tokens)
+    if not chunks:
+        return {"error": "Transcript is empty"}
+    return {
+        "video_id": video_id,
+        "duration": format_timestamp(transcript.duration),
+        "chunks": len(chunks),
+        "summary": summarize_chunks(chunks, focus=focus),
+    }
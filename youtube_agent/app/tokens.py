@@ -0,0 +1,13 @@
+"""Cheap token estimates for budgeting prompts."""
+
+# Roughly 4 characters per token for English text across the providers we
+# use. Exact counts need each provider's tokenizer; budgets only need a
+# consistent, fast estimate.
+CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in a piece of text."""
+    if not text:
+        return 0
+    return len(text) // CHARS_PER_TOKEN + 1
@@ -0,0 +1,148 @@
+import contextvars
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.tools import tool
+
+from ..config import Settings
+from ..transcripts import format_timestamp
+from .extract_metadata import get_video_info
+from .fetch_transcript import INLINE_TRANSCRIPT_CHARS, get_transcript
+from .summarize import parse_video_id
+
+
+# Most videos one bulk call accepts; the model can page through longer lists
+MAX_BULK_ITEMS = 20
+
+# Item fetches run here; the bulk tool itself already occupies a tool-pool thread
+_BULK_EXECUTOR: Optional[ThreadPoolExecutor] = None
+_BULK_EXECUTOR_LOCK = threading.Lock()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _BULK_EXECUTOR
+    if _BULK_EXECUTOR is None:
+        with _BULK_EXECUTOR_LOCK:
+            if _BULK_EXECUTOR is None:
+                _BULK_EXECUTOR = ThreadPoolExecutor(
+                    max_workers=Settings().bulk_max_parallel,
+                    thread_name_prefix="youtube-agent-bulk",
+                )
+    return _BULK_EXECUTOR
+
+
+def _fetch_each(items: List[str], fetch: Callable[[str], Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Resolve items to video IDs (deduplicated, in order) and run fetch on each
+    concurrently. A failing item becomes an entry in "errors"; the others
+    are returned under "videos".
+    """
+    video_ids: List[str] = []
+    errors: List[Dict[str, str]] = []
+    for item in items[:MAX_BULK_ITEMS]:
+        video_id = parse_video_id(str(item))
+        if video_id is None:
+            errors.append({"input": str(item), "error": "Invalid YouTube URL or video ID"})
+        elif video_id not in video_ids:
+            video_ids.append(video_id)
+    if len(items) > MAX_BULK_ITEMS:
+        errors.append(
+            {
+                "input": f"{len(items) - MAX_BULK_ITEMS} more",
+                "error": f"At most {MAX_BULK_ITEMS} videos per call; send the rest in another call",
+            }
+        )
+
+    def _safe_fetch(video_id: str) -> Dict[str, Any]:
+        try:
+            return fetch(video_id)
+        except Exception as exc:  # noqa: BLE001
+            return {"error": str(exc)}
+
+    executor = _get_executor()
+    # One context copy per item: a Context cannot be entered by two threads at once
+    futures = [
+        executor.submit(contextvars.copy_context().run, _safe_fetch, video_id)
+        for video_id in video_ids
+    ]
+    videos = []
+    for video_id, future in zip(video_ids, futures):
+        result = future.result()
+        if "error" in result:
+            errors.append({"input": video_id, "error": str(result["error"])})
+        else:
+            videos.append(result)
+    return {"videos": videos, "errors": errors} if errors else {"videos": videos}
+
+
+def _compact_metadata(video_id: str) -> Dict[str, Any]:
+    info = get_video_info(video_id)
+    if "error" in info:
+        return info
+    return {
+        "video_id": video_id,
+        "title": info.get("title"),
+        "channel": info.get("uploader"),
+        "views": info.get("view_count"),
+        "duration": info.get("duration"),
+        "likes": info.get("like_count"),
+        "comments": info.get("comment_count"),
+        "chapters": len(info.get("chapters") or []),
+        "url": f"https://youtu.be/{video_id}",
+    }
+
+
+@tool
+def get_metadata_batch(urls: List[str]) -> Dict[str, Any]:
+    """
+    Metadata for several YouTube videos in one call (compare, rank, playlists).
+
+    Args:
+        urls (List[str]): Video URLs or 11-character video IDs (up to 20).
+
+    Returns:
+        Dict: "videos", a list of {video_id, title, channel, views, duration,
+        likes, comments, chapters (count), url}, plus "errors" for any item
+        that failed. One bad item does not affect the others.
+    """
+    return _fetch_each(urls, _compact_metadata)
+
+
+@tool
+def fetch_transcripts_batch(
+    video_ids: List[str], language: str = "en", max_chars_per_video: int = 3000
+) -> Dict[str, Any]:
+    """
+    Transcripts for several YouTube videos in one call.
+
+    Each transcript is cut to max_chars_per_video, and the total stays
+    within about 12000 characters, so the text of a long video is only its
+    opening. Use summarize_transcript or get_transcript_window on a single
+    video for the rest.
+
+    Args:
+        video_ids (List[str]): Video IDs or URLs (up to 20).
+        language (str): Transcript language code.
+        max_chars_per_video (int): Character cap per transcript.
+
+    Returns:
+        Dict: "videos", a list of {video_id, duration, total_chars, text,
+        truncated}, plus "errors" for videos without a usable transcript.
+    """
+    per_video = max(200, min(max_chars_per_video, INLINE_TRANSCRIPT_CHARS // max(1, len(video_ids))))
+
+    def _excerpt(video_id: str) -> Dict[str, Any]:
+        transcript = get_transcript(video_id, language)
+        if isinstance(transcript, dict):
+            return transcript
+        end = transcript.clamp(0, len(transcript), per_video)
+        return {
+            "video_id": video_id,
+            "duration": format_timestamp(transcript.duration),
+            "total_chars": len(transcript.text),
+            "text": transcript.render(0, end),
+            "truncated": end < len(transcript),
+        }
+
+    return _fetch_each(video_ids, _excerpt)
@@ -1,19 +1,48 @@
-import logging
+import time
 from typing import Dict, List, Union
 
-import yt_dlp
 from langchain_core.tools import tool
 
 from ..cache import cached
+from ..trending import get_snapshot as get_trending_snapshot
+from ..ydl_pool import get_ydl_pool
+from .summarize import canonical_video_url
 
 
-# Suppress yt-dlp logs
-yt_dpl_logger = logging.getLogger("yt_dlp")
-yt_dpl_logger.setLevel(logging.ERROR)
+# Large yt-dlp fields no tool uses; dropped before the info dict is cached
+_UNUSED_INFO_FIELDS = (
+    "formats",
+    "requested_formats",
+    "requested_downloads",
+    "automatic_captions",
+    "subtitles",
+    "heatmap",
+    "http_headers",
+)
 
 
-@tool
 @cached(ttl=3600)  # Cache for 1 hour (metadata changes slowly)
+def _fetch_video_info(canonical_url: str) -> Dict:
+    """Run one yt-dlp extraction; returns a trimmed info dict or an error dict."""
+    try:
+        with get_ydl_pool().borrow("full") as ydl:
+            info = ydl.extract_info(canonical_url, download=False)
+    except Exception as exc:  # noqa: BLE001
+        return {"error": str(exc)}
+    return {k: v for k, v in info.items() if k not in _UNUSED_INFO_FIELDS}
+
+
+def get_video_info(url: str) -> Dict:
+    """
+    Raw yt-dlp info for a video, shared by every metadata tool.
+
+    Keyed by canonical video ID, so youtu.be/<id>, watch?v=<id> and a bare
+    ID all hit the same cache entry.
+    """
+    return _fetch_video_info(canonical_video_url(url))
+
+
+@tool
 def get_full_metadata(url: str) -> Dict:
     """
     Extract detailed metadata for a YouTube URL without downloading content.
@@ -21,104 +50,71 @@ def get_full_metadata(url: str) -> Dict:
     Returns:
         Dict: title, views, duration, channel, likes, comments, chapters
     """
-    with yt_dlp.YoutubeDL({"quiet": True, "logger": yt_dpl_logger}) as ydl:
-        info = ydl.extract_info(url, download=False)
-        return {
-            "title": info.get("title"),
-            "views": info.get("view_count"),
-            "duration": info.get("duration"),
-            "channel": info.get("uploader"),
-            "likes": info.get("like_count"),
-            "comments": info.get("comment_count"),
-            "chapters": info.get("chapters", []),
-        }
+    info = get_video_info(url)
+    if "error" in info:
+        raise RuntimeError(info["error"])
+    return {
+        "title": info.get("title"),
+        "views": info.get("view_count"),
+        "duration": info.get("duration"),
+        "channel": info.get("uploader"),
+        "likes": info.get("like_count"),
+        "comments": info.get("comment_count"),
+        "chapters": info.get("chapters", []),
+    }
 
 
 @tool
-def get_trending_videos(region_code: str) -> List[Dict[str, Union[str, int]]]:
+def get_trending_videos(region_code: str) -> Dict:
     """
-    Fetch currently trending videos for a specific region (country code).
-    Note: YouTube's trending feed has access restrictions. This function attempts
-    to fetch trending videos, but may return an error if access is blocked.
-    Returns top 25 entries with basic fields.
+    Currently trending videos for a region (country code, e.g. "US").
+
+    Served from a periodically refreshed snapshot, so it answers instantly.
+    YouTube sometimes blocks the trending feed; then the last good snapshot
+    is returned with a note, or an error if there has never been one.
+
+    Returns:
+        Dict: region, age_seconds (how old the snapshot is) and videos, a
+        list of up to 25 {title, video_id, url, channel, duration, view_count}.
     """
-    ydl_opts = {
-        "geo_bypass_country": region_code.upper(),
-        "extract_flat": True,
-        "quiet": True,
-        "no_warnings": True,
-        "logger": yt_dpl_logger,
-        "skip_download": True,
+    snapshot = get_trending_snapshot(region_code)
+    if not snapshot["videos"]:
+        return {
+            "error": f"Failed to fetch trending videos: {snapshot['last_error']}",
+            "suggestion": "YouTube's trending feed requires authentication or blocks programmatic access. Use search_youtube('trending videos') or search_youtube('popular videos') as an alternative.",
+        }
+    result = {
+        "region": snapshot["region"],
+        "age_seconds": round(time.time() - snapshot["fetched_at"]),
+        "videos": snapshot["videos"],
     }
-    try:
-        with yt_dlp.YoutubeDL(ydl_opts) as ydl:
-            # Try trending feed URL
-            info = ydl.extract_info(
-                f"https://www.youtube.com/feed/trending?gl={region_code.upper()}",
-                download=False,
-            )
-            results: List[Dict[str, Union[str, int]]] = []
-            entries = info.get("entries", [])
-            if not entries:
-                # If no entries, try alternative approach
-                return [
-                    {
-                        "error": "Trending feed access restricted. YouTube may require authentication or block programmatic access. Try using search_youtube with 'trending' or 'popular' keywords instead.",
-                        "suggestion": "Use search_youtube('trending videos') as an alternative",
-                    }
-                ]
-            for entry in entries[:25]:
-                # Ensure we have valid video data
-                if entry.get("id") and entry.get("url"):
-                    results.append(
-                        {
-                            "title": entry.get("title", "N/A"),
-                            "video_id": entry.get("id", "N/A"),
-                            "url": entry.get("url", f"https://youtu.be/{entry.get('id', '')}"),
-                            "channel": entry.get("uploader", "N/A"),
-                            "duration": entry.get("duration", 0),
-                            "view_count": entry.get("view_count", 0),
-                        }
-                    )
-            return results if results else [
-                {
-                    "error": "No trending videos found. YouTube may restrict access to trending feed.",
-                    "suggestion": "Use search_youtube('trending videos') as an alternative",
-                }
-            ]
-    except Exception as exc:  # noqa: BLE001
-        return [
-            {
-                "error": f"Failed to fetch trending videos: {str(exc)}",
-                "suggestion": "YouTube's trending feed requires authentication or blocks programmatic access. Use search_youtube('trending videos') or search_youtube('popular videos') as an alternative.",
-            }
-        ]
+    if snapshot["last_error"]:
+        result["note"] = (
+            f"The latest refresh failed ({snapshot['last_error']}); "
+            "these are the last videos fetched successfully."
+        )
+    return result
 
 
 @tool
-@cached(ttl=86400)  # Cache for 24 hours (thumbnails don't change)
 def get_thumbnails(url: str) -> List[Dict[str, Union[str, int]]]:
     """
     Retrieve available thumbnails for a YouTube URL.
     """
-    try:
-        with yt_dlp.YoutubeDL({"quiet": True, "logger": yt_dpl_logger}) as ydl:
-            info = ydl.extract_info(url, download=False)
-            thumbnails: List[Dict[str, Union[str, int]]] = []
-            for t in info.get("thumbnails", []):
-                if "url" in t:
-                    thumbnails.append(
-                        {
-                            "url": t["url"],
-                            "width": t.get("width"),
-                            "height": t.get("height"),
-                            "resolution": f"{t.get('width', '')}x{t.get('height', '')}".strip(
-                                "x"
-                            ),
-                        }
-                    )
-            return thumbnails
-    except Exception as exc:  # noqa: BLE001
-        return [{"error": f"Failed to get thumbnails: {str(exc)}"}]
-
-
+    info = get_video_info(url)
+    if "error" in info:
+        return [{"error": f"Failed to get thumbnails: {info['error']}"}]
+    thumbnails: List[Dict[str, Union[str, int]]] = []
+    for t in info.get("thumbnails", []):
+        if "url" in t:
+            thumbnails.append(
+                {
+                    "url": t["url"],
+                    "width": t.get("width"),
+                    "height": t.get("height"),
+                    "resolution": f"{t.get('width', '')}x{t.get('height', '')}".strip(
+                        "x"
+                    ),
+                }
+            )
+    return thumbnails
@@ -1,19 +1,67 @@
 import logging
-from typing import Union
+from typing import Optional, Union
 
 from langchain_core.tools import tool
-from youtube_transcript_api import YouTubeTranscriptApi
 
 from ..cache import cached
+from ..http_session import get_http_session
+from ..transcript_index import index_transcript
+from ..transcripts import Transcript, format_timestamp
 
 
 # Suppress library logs
 yt_api_logger = logging.getLogger("youtube_transcript_api")
 yt_api_logger.setLevel(logging.ERROR)
 
+# Transcripts longer than this are not inlined; the model pages through them
+# with get_transcript_window instead of carrying the full text every turn.
+INLINE_TRANSCRIPT_CHARS = 12000
+TRANSCRIPT_CHUNK_CHARS = 4000
+
+
+_API = None
+
+
+def _transcript_api():
+    """One client for the process, on the shared keep-alive session."""
+    global _API
+    if _API is None:
+        from youtube_transcript_api import YouTubeTranscriptApi  # loaded on first fetch
+
+        _API = YouTubeTranscriptApi(http_client=get_http_session())
+    return _API
+
+
+@cached(ttl=86400, max_bytes=64 * 1024 * 1024)  # Cache for 24 hours (transcripts don't change)
+def _fetch_transcript(video_id: str, language: str = "en") -> Union[Transcript, dict]:
+    try:
+        transcript = _transcript_api().fetch(video_id, languages=[language])
+        # The library returns an object with .snippets in newer versions in the lab,
+        # but commonly returns a list of dicts with 'text'. Handle both.
+        if hasattr(transcript, "snippets"):
+            snippets = ((s.start, s.duration, s.text) for s in transcript.snippets)
+        else:
+            snippets = (
+                (s.get("start", 0.0), s.get("duration", 0.0), s.get("text", ""))
+                for s in transcript
+            )
+        return Transcript.from_snippets(video_id, language, snippets)
+    except Exception as exc:  # noqa: BLE001
+        return {"error": f"Failed to fetch transcript: {str(exc)}"}
+
+
+def get_transcript(video_id: str, language: str = "en") -> Union[Transcript, dict]:
+    """
+    Fetch and cache the timestamped transcript; returns an error dict on failure.
+    Every transcript returned is also added to the full-text index (once).
+    """
+    transcript = _fetch_transcript(video_id, language)
+    if isinstance(transcript, Transcript):
+        index_transcript(transcript)
+    return transcript
+
 
 @tool
-@cached(ttl=86400)  # Cache for 24 hours (transcripts don't change)
 def fetch_transcript(video_id: str, language: str = "en") -> Union[str, dict]:
     """
     Fetch the transcript of a YouTube video.
@@ -23,17 +71,63 @@ def fetch_transcript(video_id: str, language: str = "en") -> Union[str, dict]:
         language (str): Language code for the transcript (e.g., "en", "es").
 
     Returns:
-        str | dict: Transcript text on success; error dict on failure.
+        str | dict: Transcript text for short videos; for long videos a dict
+        with the first chunk and the chunk count (read the rest with
+        get_transcript_window); error dict on failure.
     """
-    try:
-        api = YouTubeTranscriptApi()
-        transcript = api.fetch(video_id, languages=[language])
-        # The library returns an object with .snippets in newer versions in the lab,
-        # but commonly returns a list of dicts with 'text'. Handle both.
-        if hasattr(transcript, "snippets"):
-            return " ".join(snippet.text for snippet in transcript.snippets)
-        return " ".join(segment.get("text", "") for segment in transcript)
-    except Exception as exc:  # noqa: BLE001
-        return {"error": f"Failed to fetch transcript: {str(exc)}"}
+    transcript = get_transcript(video_id, language)
+    if isinstance(transcript, dict):
+        return transcript
+    if len(transcript.text) <= INLINE_TRANSCRIPT_CHARS:
+        return transcript.text
+    chunks = transcript.chunk_bounds(TRANSCRIPT_CHUNK_CHARS)
+    return {
+        "video_id": video_id,
+        "duration": format_timestamp(transcript.duration),
+        "total_chars": len(transcript.text),
+        "chunks": len(chunks),
+        "chunk_0": transcript.window(*chunks[0]),
+        "note": (
+            "Transcript is long. Use get_transcript_window with chunk_index "
+            "or start/end seconds to read other parts."
+        ),
+    }
+
 
+@tool
+def get_transcript_window(
+    video_id: str,
+    start_seconds: Optional[float] = None,
+    end_seconds: Optional[float] = None,
+    chunk_index: Optional[int] = None,
+    language: str = "en",
+) -> dict:
+    """
+    Read part of a video's transcript, with [m:ss] timestamps.
 
+    Pass either chunk_index (0-based, ~4000 characters per chunk) or a time
+    range in seconds (start_seconds/end_seconds).
+
+    Returns:
+        dict: video_id, start, end, text (plus chunk_index/chunks when paging by chunk),
+        or an error dict.
+    """
+    transcript = get_transcript(video_id, language)
+    if isinstance(transcript, dict):
+        return transcript
+    if chunk_index is not None:
+        chunks = transcript.chunk_bounds(TRANSCRIPT_CHUNK_CHARS)
+        if not 0 <= chunk_index < len(chunks):
+            return {"error": f"chunk_index must be between 0 and {len(chunks) - 1}"}
+        result = transcript.window(*chunks[chunk_index])
+        result.update({"chunk_index": chunk_index, "chunks": len(chunks)})
+        return result
+    start = start_seconds or 0.0
+    end = end_seconds if end_seconds is not None else transcript.duration
+    first, last = transcript.snippet_range(start, end)
+    # Same size cap as a chunk so a wide range can't pull in the whole transcript
+    clamped = transcript.clamp(first, last, TRANSCRIPT_CHUNK_CHARS)
+    result = transcript.window(first, clamped)
+    if clamped < last:
+        result["next_start_seconds"] = transcript.starts[clamped]
+    return result
@@ -0,0 +1,58 @@
+import sqlite3
+from typing import Any, Dict, List, Optional
+
+from langchain_core.tools import tool
+
+from ..transcript_index import get_transcript_index
+from ..transcripts import format_timestamp
+from .summarize import parse_video_id
+
+
+MAX_TRANSCRIPT_HITS = 25
+
+
+@tool
+def search_transcripts(
+    query: str, video_ids: Optional[List[str]] = None, max_results: int = 10
+) -> Dict[str, Any]:
+    """
+    Search inside the transcripts already fetched (a local index, not YouTube).
+
+    Use it for "which of these videos mentions X" or "where does it talk
+    about Y" instead of fetching and reading whole transcripts. Videos whose
+    transcript has not been fetched yet are listed in not_indexed: fetch
+    them (fetch_transcripts_batch), then search again.
+
+    Args:
+        query (str): Words to look for; passages containing all of them rank
+            first (word variants such as "train"/"training" match).
+        video_ids (List[str]): Optional video IDs or URLs to restrict the search to.
+        max_results (int): Passages to return (1-25).
+
+    Returns:
+        Dict: "results", a list of {video_id, timestamp, snippet, url}
+        (matched words in **bold**, url opens the video at the passage; at
+        most 3 per video), plus "not_indexed" when video_ids were given.
+    """
+    ids = [parse_video_id(str(v)) or str(v) for v in (video_ids or [])]
+    limit = max(1, min(int(max_results), MAX_TRANSCRIPT_HITS))
+    try:
+        index = get_transcript_index()
+        hits = index.search(query, ids, limit=limit)
+        indexed = index.indexed(ids)
+    except sqlite3.Error as exc:
+        return {"error": f"Transcript index unavailable: {exc}"}
+    result: Dict[str, Any] = {
+        "results": [
+            {
+                "video_id": hit["video_id"],
+                "timestamp": format_timestamp(hit["start"]),
+                "snippet": hit["snippet"],
+                "url": f"https://youtu.be/{hit['video_id']}?t={int(hit['start'])}",
+            }
+            for hit in hits
+        ]
+    }
+    if ids:
+        result["not_indexed"] = [v for v in dict.fromkeys(ids) if v not in indexed]
+    return result
@@ -1,41 +1,195 @@
 import logging
-from typing import List, Dict, Union
+import re
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from langchain_core.tools import tool
-from pytube import Search
 
 from ..cache import cached
+from ..http_session import install_pytube_session
+from ..transcripts import format_timestamp
 
 
 # Suppress pytube noise
 pytube_logger = logging.getLogger("pytube")
 pytube_logger.setLevel(logging.ERROR)
 
+MAX_SEARCH_RESULTS = 20
+# YouTube pages (about 20 videos each) one call may read to fill a filtered page
+MAX_SEARCH_PAGES = 5
+# Optional per-result fields; title, video_id and url are always returned
+SEARCH_FIELDS = ("channel", "duration", "views", "published")
+
+_VIEWS = re.compile(r"[\d,]+")
+_AGE = re.compile(r"(\d+)\s+(second|minute|hour|day|week|month|year)s?\s+ago")
+_AGE_DAYS = {"second": 0, "minute": 0, "hour": 0, "day": 1, "week": 7, "month": 30, "year": 365}
+
+
+def _text(renderer: Dict[str, Any], key: str) -> Optional[str]:
+    value = renderer.get(key) or {}
+    if "simpleText" in value:
+        return value["simpleText"]
+    runs = value.get("runs") or []
+    return "".join(run.get("text", "") for run in runs) or None
+
+
+def _duration_seconds(text: Optional[str]) -> Optional[int]:
+    """Seconds in a "1:02:03" length; None for live streams and premieres."""
+    if not text:
+        return None
+    try:
+        seconds = 0
+        for part in text.split(":"):
+            seconds = seconds * 60 + int(part)
+        return seconds
+    except ValueError:
+        return None
+
+
+def _age_days(published: Optional[str]) -> Optional[int]:
+    """Approximate age in days of "3 weeks ago" / "Streamed 2 days ago"."""
+    match = _AGE.search(published or "")
+    if match is None:
+        return None
+    return int(match.group(1)) * _AGE_DAYS[match.group(2)]
+
+
+def _parse_video(renderer: Dict[str, Any]) -> Dict[str, Any]:
+    video_id = renderer["videoId"]
+    views = _VIEWS.search(_text(renderer, "viewCountText") or "")
+    return {
+        "title": _text(renderer, "title") or "",
+        "video_id": video_id,
+        "url": f"https://youtu.be/{video_id}",
+        "channel": _text(renderer, "ownerText"),
+        "duration": _duration_seconds(_text(renderer, "lengthText")),
+        "views": int(views.group().replace(",", "")) if views else None,
+        "published": _text(renderer, "publishedTimeText"),
+    }
+
+
+def _parse_results(raw: Dict[str, Any]) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """Videos and next continuation token from a raw innertube search response."""
+    # The first page and continuation pages are shaped differently
+    try:
+        sections = raw["contents"]["twoColumnSearchResultsRenderer"]["primaryContents"][
+            "sectionListRenderer"
+        ]["contents"]
+    except KeyError:
+        sections = raw["onResponseReceivedCommands"][0]["appendContinuationItemsAction"][
+            "continuationItems"
+        ]
+    videos: List[Dict[str, Any]] = []
+    continuation = None
+    for section in sections:
+        for item in section.get("itemSectionRenderer", {}).get("contents", []):
+            # Ads, shelves, channels, playlists and mixes have other renderers
+            if "videoRenderer" in item:
+                videos.append(_parse_video(item["videoRenderer"]))
+        if "continuationItemRenderer" in section:
+            continuation = section["continuationItemRenderer"]["continuationEndpoint"][
+                "continuationCommand"
+            ]["token"]
+    return videos, continuation
+
 
-@tool
 @cached(ttl=1800)  # Cache for 30 minutes (search results change frequently)
-def search_youtube(query: str) -> Union[List[Dict[str, str]], str]:
+def _search_page(query: str, continuation: Optional[str] = None) -> Union[Dict[str, Any], str]:
+    """
+    One page of YouTube results with every field, plus the token for the
+    next page. Every max_results/filter/field combination is cut from these
+    cached pages, so a smaller or differently filtered request for the same
+    query does not search again.
+    """
+    try:
+        from pytube import Search  # loaded on first search
+
+        install_pytube_session()
+        videos, next_token = _parse_results(Search(query).fetch_query(continuation))
+        return {"videos": videos, "continuation": next_token}
+    except Exception as exc:  # noqa: BLE001
+        return f"Error: {str(exc)}"
+
+
+def _matches(
+    video: Dict[str, Any],
+    min_duration_minutes: Optional[float],
+    max_duration_minutes: Optional[float],
+    uploaded_within_days: Optional[int],
+) -> bool:
+    """Apply the filters; a video whose value is unknown fails a filter on it."""
+    duration = video["duration"]
+    if min_duration_minutes is not None and (duration is None or duration < min_duration_minutes * 60):
+        return False
+    if max_duration_minutes is not None and (duration is None or duration > max_duration_minutes * 60):
+        return False
+    if uploaded_within_days is not None:
+        age = _age_days(video["published"])
+        if age is None or age > uploaded_within_days:
+            return False
+    return True
+
+
+def _project(video: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+    result = {"title": video["title"], "video_id": video["video_id"], "url": video["url"]}
+    for name in fields:
+        value = video.get(name)
+        if name == "duration" and value is not None:
+            value = format_timestamp(value)
+        result[name] = value
+    return result
+
+
+@tool
+def search_youtube(
+    query: str,
+    max_results: int = 5,
+    page: int = 1,
+    fields: Optional[List[str]] = None,
+    min_duration_minutes: Optional[float] = None,
+    max_duration_minutes: Optional[float] = None,
+    uploaded_within_days: Optional[int] = None,
+) -> Union[List[Dict[str, Any]], str]:
     """
     Search YouTube for videos matching the query.
 
     Args:
         query (str): The search term to look for on YouTube
+        max_results (int): Results to return (1-20, default 5). Ask only for
+            as many as you will show.
+        page (int): Page of max_results results; use page=2 for the next ones.
+        fields (List[str]): Extra fields per result, any of "channel",
+            "duration", "views", "published" (e.g. "3 weeks ago").
+        min_duration_minutes (float): Only videos at least this long.
+        max_duration_minutes (float): Only videos at most this long.
+        uploaded_within_days (int): Only videos published in the last N days.
 
     Returns:
-        List[Dict[str, str]] | str: On success, a list of dicts containing
-        title, video_id and url for each result. On failure, an error string.
+        List[Dict[str, Any]] | str: On success, a list of dicts containing
+        title, video_id and url (plus any requested fields) for each
+        result; an empty list when nothing matches. On failure, an error
+        string.
     """
-    try:
-        search = Search(query)
-        return [
-            {
-                "title": yt.title,
-                "video_id": yt.video_id,
-                "url": f"https://youtu.be/{yt.video_id}",
-            }
-            for yt in search.results
-        ]
-    except Exception as exc:  # noqa: BLE001
-        return f"Error: {str(exc)}"
-
+    max_results = max(1, min(int(max_results), MAX_SEARCH_RESULTS))
+    start = (max(1, int(page)) - 1) * max_results
+    wanted = [name for name in (fields or []) if name in SEARCH_FIELDS]
 
+    matches: List[Dict[str, Any]] = []
+    seen = set()
+    continuation = None
+    for _ in range(MAX_SEARCH_PAGES):
+        result = _search_page(query, continuation)
+        if isinstance(result, str):
+            if not matches:
+                return result
+            break
+        for video in result["videos"]:
+            # Continuation pages can repeat a video from an earlier page
+            if video["video_id"] in seen:
+                continue
+            seen.add(video["video_id"])
+            if _matches(video, min_duration_minutes, max_duration_minutes, uploaded_within_days):
+                matches.append(video)
+        continuation = result["continuation"]
+        if len(matches) >= start + max_results or not continuation:
+            break
+    return [_project(video, wanted) for video in matches[start : start + max_results]]
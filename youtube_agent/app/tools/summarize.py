@@ -1,19 +1,37 @@
-from typing import Optional
+import re
+from typing import Optional, Union
 
 from langchain_core.tools import tool
 
 
+_VIDEO_ID_PATTERN = re.compile(r"(?:v=|be/|embed/|shorts/|live/)([a-zA-Z0-9_-]{11})")
+_BARE_VIDEO_ID = re.compile(r"[a-zA-Z0-9_-]{11}")
+
+
+def parse_video_id(url: str) -> Optional[str]:
+    """Return the 11-character video ID from a YouTube URL (or a bare ID), else None."""
+    url = url.strip()
+    match = _VIDEO_ID_PATTERN.search(url)
+    if match:
+        return match.group(1)
+    if _BARE_VIDEO_ID.fullmatch(url):
+        return url
+    return None
+
+
+def canonical_video_url(url: str) -> str:
+    """Map any URL form of a video (watch, youtu.be, embed, shorts) to one canonical URL."""
+    video_id = parse_video_id(url)
+    return f"https://www.youtube.com/watch?v={video_id}" if video_id else url.strip()
+
+
 @tool
 def extract_video_id(url: str) -> str:
     """
     Extract the 11-character YouTube video ID from a URL.
     Supports common formats (watch, youtu.be, embed).
     """
-    import re  # local import to keep global namespace clean
-
-    pattern = r"(?:v=|be/|embed/)([a-zA-Z0-9_-]{11})"
-    match = re.search(pattern, url)
-    return match.group(1) if match else "Error: Invalid YouTube URL"
+    return parse_video_id(url) or "Error: Invalid YouTube URL"
 
 
 @tool
@@ -26,3 +44,20 @@ def truncate_text(text: str, max_chars: int = 3000) -> str:
     return text[: max_chars - 3] + "..."
 
 
+@tool
+def summarize_transcript(video_id: str, focus: str = "", language: str = "en") -> Union[dict, str]:
+    """
+    Summarize a video's complete transcript, however long it is.
+
+    The transcript is split on timestamp boundaries, the parts are summarized
+    in parallel and then merged, so nothing after the first few thousand
+    characters is lost. Prefer this over reading a long transcript chunk by chunk.
+
+    Args:
+        video_id (str): The YouTube video ID.
+        focus (str): Optional aspect to emphasise (e.g. "the pricing discussion").
+        language (str): Transcript language code.
+    """
+    from ..summarizer import summarize_video  # local import: pulls in the LLM client
+
+    return summarize_video(video_id, focus=focus, language=language)
@@ -0,0 +1,233 @@
+"""Per-request execution traces and process-wide latency metrics."""
+
+import bisect
+import hashlib
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# The trace of the request being handled, and the tool call currently running
+# in this context (the cache layer marks it as a hit or miss).
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("youtube_agent_trace", default=None)
+_current_tool_span: ContextVar[Optional[dict]] = ContextVar("youtube_agent_tool_span", default=None)
+# Told the token count of every LLM call made inside a tool (the summarizer's
+# map-reduce calls) so the agent run's token budget includes them
+_llm_token_sink: ContextVar[Optional[Callable[[int], None]]] = ContextVar(
+    "youtube_agent_llm_token_sink", default=None
+)
+
+# Tool output prefixes that mean the call failed: exceptions and error strings
+# ("Error: ..."), error dicts and bulk results whose first item is an error
+_TOOL_ERROR_PREFIXES = ("Error", '{"error"', '[{"error"')
+
+
+class Trace:
+    """Structured record of the LLM and tool calls made for one request."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.llm_calls: List[dict] = []
+        self.tool_calls: List[dict] = []
+
+    def add_llm_call(self, span: dict) -> None:
+        with self._lock:
+            self.llm_calls.append(span)
+
+    def add_tool_call(self, span: dict) -> None:
+        with self._lock:
+            self.tool_calls.append(span)
+
+    def as_dict(self) -> dict:
+        return {
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+            "llm_ms": round(sum(c["latency_ms"] for c in self.llm_calls), 1),
+            "tool_ms": round(sum(c["latency_ms"] for c in self.tool_calls), 1),
+            "prompt_tokens": sum(c["prompt_tokens"] for c in self.llm_calls),
+            "completion_tokens": sum(c["completion_tokens"] for c in self.llm_calls),
+            "llm_calls": list(self.llm_calls),
+            "tool_calls": list(self.tool_calls),
+        }
+
+
+@contextmanager
+def trace_request() -> Iterator[Trace]:
+    """Collect a Trace for everything run in this context (including copied contexts)."""
+    trace = Trace()
+    token = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(token)
+
+
+def current_trace() -> Optional[Trace]:
+    return _current_trace.get()
+
+
+def args_hash(args: Any) -> str:
+    return hashlib.md5(json.dumps(args, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+def record_llm_call(latency: float, response: Any, prompt_tokens_estimate: int) -> None:
+    """Record one LLM call; token counts come from usage_metadata when the provider sends it."""
+    usage = getattr(response, "usage_metadata", None) or {}
+    estimated = not usage.get("input_tokens")
+    prompt_tokens = prompt_tokens_estimate if estimated else usage["input_tokens"]
+    completion_tokens = usage.get("output_tokens", 0)
+    LLM_LATENCY.observe(latency)
+    TOKENS.inc(prompt_tokens, kind="prompt")
+    TOKENS.inc(completion_tokens, kind="completion")
+    sink = _llm_token_sink.get()
+    if sink is not None:
+        sink(prompt_tokens + completion_tokens)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_llm_call(
+            {
+                "latency_ms": round(latency * 1000, 1),
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "tokens_estimated": estimated,
+                "tool_calls": len(getattr(response, "tool_calls", None) or []),
+            }
+        )
+
+
+@contextmanager
+def count_llm_tokens(sink: Optional[Callable[[int], None]]) -> Iterator[None]:
+    """Pass the tokens of LLM calls recorded in this context (and copies made from it) to sink."""
+    token = _llm_token_sink.set(sink)
+    try:
+        yield
+    finally:
+        _llm_token_sink.reset(token)
+
+
+@contextmanager
+def tool_span(name: str, args: Any) -> Iterator[dict]:
+    """Time one tool call; the caller fills in result_size and error."""
+    span = {"name": name, "args_hash": args_hash(args), "cache": None}
+    token = _current_tool_span.set(span)
+    started = time.perf_counter()
+    try:
+        yield span
+    finally:
+        latency = time.perf_counter() - started
+        _current_tool_span.reset(token)
+        span["latency_ms"] = round(latency * 1000, 1)
+        TOOL_LATENCY.observe(latency, tool=name)
+        if span["cache"]:
+            CACHE_LOOKUPS.inc(tool=name, result=span["cache"])
+        trace = _current_trace.get()
+        if trace is not None:
+            trace.add_tool_call(span)
+
+
+def is_tool_error(content: Any) -> bool:
+    """True when a tool's (serialized) output reports a failure."""
+    return str(content).startswith(_TOOL_ERROR_PREFIXES)
+
+
+def record_cache_event(hit: bool) -> None:
+    """Mark the running tool call as a cache hit or miss (the outermost cache layer wins)."""
+    span = _current_tool_span.get()
+    if span is not None and span["cache"] is None:
+        span["cache"] = "hit" if hit else "miss"
+
+
+class _Histogram:
+    """Minimal Prometheus histogram with labels."""
+
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[Tuple[str, str], ...], list] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.setdefault(key, [[0] * len(self.buckets), 0, 0.0])
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += 1
+            series[2] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, count, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(
+                        f"{self.name}_bucket{_labels(key, le=repr(float(bound)))} {cumulative}"
+                    )
+                lines.append(f'{self.name}_bucket{_labels(key, le="+Inf")} {count}')
+                lines.append(f"{self.name}_sum{_labels(key)} {total}")
+                lines.append(f"{self.name}_count{_labels(key)} {count}")
+        return lines
+
+
+class _Counter:
+    """Minimal Prometheus counter with labels."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._lock = threading.Lock()
+        self._series: Dict[Tuple[Tuple[str, str], ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._series[key] = self._series.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._series.items()):
+                lines.append(f"{self.name}{_labels(key)} {value}")
+        return lines
+
+
+def _labels(key: Tuple[Tuple[str, str], ...], **extra: str) -> str:
+    pairs = list(key) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in pairs) + "}"
+
+
+_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+REQUEST_LATENCY = _Histogram(
+    "youtube_agent_request_seconds", "End-to-end request latency.", _LATENCY_BUCKETS
+)
+LLM_LATENCY = _Histogram("youtube_agent_llm_call_seconds", "LLM call latency.", _LATENCY_BUCKETS)
+TOOL_LATENCY = _Histogram("youtube_agent_tool_call_seconds", "Tool call latency.", _LATENCY_BUCKETS)
+TOKENS = _Counter("youtube_agent_llm_tokens_total", "LLM tokens by kind (prompt/completion).")
+CACHE_LOOKUPS = _Counter("youtube_agent_tool_cache_total", "Tool cache lookups by result.")
+RESPONSE_CACHE_LOOKUPS = _Counter(
+    "youtube_agent_response_cache_total", "Whole-query response cache lookups by result."
+)
+
+
+def render_metrics() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in (
+        REQUEST_LATENCY,
+        LLM_LATENCY,
+        TOOL_LATENCY,
+        TOKENS,
+        CACHE_LOOKUPS,
+        RESPONSE_CACHE_LOOKUPS,
+    ):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
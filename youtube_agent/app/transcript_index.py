@@ -0,0 +1,180 @@
+"""
+Full-text index over every transcript fetched through get_transcript.
+
+Transcripts are split into short passages and added to a SQLite FTS5 table
+the first time get_transcript returns them, so "which of these videos
+mentions X" is one local BM25-ranked query instead of a transcript fetch
+per video and the full texts in the model's context. The database lives
+next to the tool cache (TRANSCRIPT_INDEX_PATH overrides it) and is shared
+by every worker process using that directory.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from .config import Settings
+from .transcripts import Transcript
+
+
+# Characters per indexed passage: enough context for a snippet, small
+# enough that a hit points at a precise timestamp
+PASSAGE_CHARS = 300
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    video_id TEXT NOT NULL,
+    language TEXT NOT NULL,
+    passages INTEGER NOT NULL,
+    PRIMARY KEY (video_id, language)
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS passages USING fts5(
+    text,
+    video_id UNINDEXED,
+    language UNINDEXED,
+    start UNINDEXED,
+    tokenize = 'porter unicode61'
+);
+"""
+
+_WORD = re.compile(r"\w+", re.UNICODE)
+
+
+class TranscriptIndex:
+    """
+    One SQLite connection shared by all threads behind a lock. Writes are
+    a few milliseconds per transcript; reads are sub-millisecond for
+    thousands of videos.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=10)
+        self._lock = threading.Lock()
+        # (video_id, language) pairs known to be indexed; skips the database on repeats
+        self._indexed: Set[Tuple[str, str]] = set()
+        with self._lock, self._conn:
+            if path != ":memory:":
+                self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(_SCHEMA)
+
+    def add(self, transcript: Transcript) -> bool:
+        """Index transcript unless it already is; True when passages were written."""
+        key = (transcript.video_id, transcript.language)
+        if key in self._indexed:
+            return False
+        passages = transcript.passages(PASSAGE_CHARS)
+        with self._lock, self._conn:
+            known = self._conn.execute(
+                "SELECT 1 FROM videos WHERE video_id = ? AND language = ?", key
+            ).fetchone()
+            if known is None:
+                self._conn.executemany(
+                    "INSERT INTO passages (text, video_id, language, start) VALUES (?, ?, ?, ?)",
+                    [(text, *key, start) for start, text in passages],
+                )
+                self._conn.execute("INSERT INTO videos VALUES (?, ?, ?)", (*key, len(passages)))
+            self._indexed.add(key)
+        return known is None
+
+    def search(
+        self,
+        query: str,
+        video_ids: Optional[Iterable[str]] = None,
+        limit: int = 10,
+        per_video: int = 3,
+    ) -> List[Dict[str, Any]]:
+        """
+        Best-matching passages (BM25) for the words in query, each as
+        {video_id, language, start, snippet}, at most per_video from one
+        video so several videos can show up. All words must match; when
+        nothing does, passages with any of them are returned instead.
+        """
+        words = _WORD.findall(query)
+        if not words:
+            return []
+        ids = list(dict.fromkeys(video_ids or []))
+        # Quoted terms: user text is never parsed as FTS5 query syntax
+        terms = [f'"{word}"' for word in words]
+        matches = [" ".join(terms)]
+        if len(terms) > 1:
+            matches.append(" OR ".join(terms))
+        for match in matches:
+            sql = (
+                "SELECT video_id, language, start,"
+                " snippet(passages, 0, '**', '**', '…', 24)"
+                " FROM passages WHERE passages MATCH ?"
+            )
+            params: List[Any] = [match]
+            if ids:
+                sql += f" AND video_id IN ({', '.join('?' * len(ids))})"
+                params += ids
+            sql += " ORDER BY rank LIMIT ?"
+            params.append(limit * per_video)
+            with self._lock:
+                rows = self._conn.execute(sql, params).fetchall()
+            hits: List[Dict[str, Any]] = []
+            counts: Dict[str, int] = {}
+            for video_id, language, start, snippet in rows:
+                if counts.get(video_id, 0) < per_video:
+                    counts[video_id] = counts.get(video_id, 0) + 1
+                    hits.append(
+                        {"video_id": video_id, "language": language, "start": start, "snippet": snippet}
+                    )
+            if hits:
+                return hits[:limit]
+        return []
+
+    def indexed(self, video_ids: Iterable[str]) -> Set[str]:
+        """Which of video_ids have a transcript (in any language) in the index."""
+        ids = list(dict.fromkeys(video_ids))
+        if not ids:
+            return set()
+        placeholders = ", ".join("?" * len(ids))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT DISTINCT video_id FROM videos WHERE video_id IN ({placeholders})", ids
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            videos, passages = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(passages), 0) FROM videos"
+            ).fetchone()
+        return {"path": self.path, "videos": videos, "passages": passages}
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM passages")
+            self._conn.execute("DELETE FROM videos")
+            self._indexed.clear()
+
+
+_INDEX: Optional[TranscriptIndex] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_transcript_index() -> TranscriptIndex:
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                settings = Settings()
+                path = settings.transcript_index_path or os.path.join(
+                    settings.cache_dir, "transcripts.sqlite3"
+                )
+                _INDEX = TranscriptIndex(path)
+    return _INDEX
+
+
+def index_transcript(transcript: Transcript) -> None:
+    """Add a fetched transcript to the index; indexing problems never fail the fetch."""
+    try:
+        get_transcript_index().add(transcript)
+    except (sqlite3.Error, OSError):
+        pass
@@ -0,0 +1,138 @@
+"""Compact, timestamped transcript representation."""
+
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Iterable, List, Tuple
+
+
+def format_timestamp(seconds: float) -> str:
+    """Format seconds as m:ss or h:mm:ss."""
+    seconds = int(seconds)
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{secs:02d}"
+    return f"{minutes}:{secs:02d}"
+
+
+class Transcript:
+    """
+    A transcript stored as one text blob plus parallel arrays.
+
+    Snippet i spans text[offsets[i]:offsets[i + 1] - 1] (snippets are joined
+    with a single space) and is shown from starts[i] for durations[i] seconds.
+    This keeps the timing information at ~20 bytes per snippet instead of a
+    dict per snippet, and makes time-range and chunk lookups O(log n).
+    """
+
+    __slots__ = ("video_id", "language", "text", "starts", "durations", "offsets")
+
+    def __init__(
+        self,
+        video_id: str,
+        language: str,
+        text: str,
+        starts: array,
+        durations: array,
+        offsets: array,
+    ):
+        self.video_id = video_id
+        self.language = language
+        self.text = text
+        self.starts = starts
+        self.durations = durations
+        self.offsets = offsets
+
+    @classmethod
+    def from_snippets(
+        cls, video_id: str, language: str, snippets: Iterable[Tuple[float, float, str]]
+    ) -> "Transcript":
+        """Build from (start, duration, text) tuples in playback order."""
+        starts = array("d")
+        durations = array("d")
+        offsets = array("L")
+        parts: List[str] = []
+        position = 0
+        for start, duration, text in snippets:
+            text = " ".join(text.split())
+            if not text:
+                continue
+            starts.append(float(start))
+            durations.append(float(duration))
+            offsets.append(position)
+            parts.append(text)
+            position += len(text) + 1
+        # Sentinel so snippet i always ends at offsets[i + 1] - 1
+        offsets.append(position)
+        return cls(video_id, language, " ".join(parts), starts, durations, offsets)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def duration(self) -> float:
+        if not self.starts:
+            return 0.0
+        return self.starts[-1] + self.durations[-1]
+
+    def _span_text(self, first: int, last: int) -> str:
+        """Text of snippets [first, last)."""
+        if first >= last:
+            return ""
+        return self.text[self.offsets[first] : self.offsets[last] - 1]
+
+    def snippet_range(self, start_seconds: float, end_seconds: float) -> Tuple[int, int]:
+        """Indices [first, last) of snippets on screen between the two times."""
+        first = bisect_right(self.starts, start_seconds) - 1
+        if first < 0 or self.starts[first] + self.durations[first] <= start_seconds:
+            first += 1
+        last = bisect_left(self.starts, end_seconds)
+        return max(first, 0), max(last, first, 0)
+
+    def clamp(self, first: int, last: int, max_chars: int) -> int:
+        """Largest end <= last so snippets [first, end) fit in max_chars (at least one snippet)."""
+        if first >= last:
+            return last
+        fits = bisect_right(self.offsets, self.offsets[first] + max_chars + 1, lo=first + 1) - 1
+        return min(last, max(fits, first + 1))
+
+    def chunk_bounds(self, chunk_chars: int) -> List[Tuple[int, int]]:
+        """Split into [first, last) snippet ranges of about chunk_chars characters each."""
+        bounds = []
+        first = 0
+        count = len(self)
+        while first < count:
+            target = self.offsets[first] + chunk_chars
+            last = min(max(bisect_left(self.offsets, target, lo=first + 1), first + 1), count)
+            bounds.append((first, last))
+            first = last
+        return bounds
+
+    def passages(self, chars: int) -> List[Tuple[float, str]]:
+        """(start seconds, plain text) of consecutive ~chars-character passages."""
+        return [
+            (self.starts[first], self._span_text(first, last))
+            for first, last in self.chunk_bounds(chars)
+        ]
+
+    def render(self, first: int, last: int, marker_every: float = 30.0) -> str:
+        """Text of snippets [first, last) with a [m:ss] marker at least every marker_every seconds."""
+        pieces: List[str] = []
+        next_marker = None
+        for i in range(first, last):
+            if next_marker is None or self.starts[i] >= next_marker:
+                pieces.append(f"[{format_timestamp(self.starts[i])}]")
+                next_marker = self.starts[i] + marker_every
+            pieces.append(self._span_text(i, i + 1))
+        return " ".join(pieces)
+
+    def window(self, first: int, last: int) -> dict:
+        """Compact dict describing snippets [first, last) for tool output."""
+        if first >= last:
+            return {"video_id": self.video_id, "start": None, "end": None, "text": ""}
+        return {
+            "video_id": self.video_id,
+            "start": format_timestamp(self.starts[first]),
+            "end": format_timestamp(self.starts[last - 1] + self.durations[last - 1]),
+            "text": self.render(first, last),
+        }
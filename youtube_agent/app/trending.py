@@ -0,0 +1,188 @@
+"""
+Per-region snapshots of YouTube's trending feed.
+
+A flat extraction of feed/trending takes seconds and is often refused, so
+the feed is never read on the request path when it can be avoided: the
+API server refreshes TRENDING_REGIONS in a background thread, other
+regions are fetched on first request and kept for TRENDING_REFRESH_SECONDS.
+A failed refresh keeps the last good list and records the error, so callers
+get the previous snapshot (with its age) instead of a slow failure.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from .cache import get_named_cache, record_lookup
+from .config import Settings
+from .ydl_pool import get_ydl_pool
+
+
+_CACHE_NAME = "trending"
+# Snapshots outlive many refreshes so a feed that starts failing still has a last good list
+_SNAPSHOT_TTL = 7 * 86400
+MAX_TRENDING_ENTRIES = 25
+
+_region_locks: Dict[str, threading.Lock] = {}
+_region_locks_guard = threading.Lock()
+
+
+def _key(region: str) -> str:
+    return f"trending:{region}"
+
+
+def _region_lock(region: str) -> threading.Lock:
+    with _region_locks_guard:
+        return _region_locks.setdefault(region, threading.Lock())
+
+
+def fetch_trending(region: str) -> List[Dict[str, Any]]:
+    """Live flat extraction of one region's trending feed; raises when it yields nothing."""
+    with get_ydl_pool().borrow("flat", geo=region) as ydl:
+        info = ydl.extract_info(f"https://www.youtube.com/feed/trending?gl={region}", download=False)
+    videos = [
+        {
+            "title": entry.get("title", "N/A"),
+            "video_id": entry["id"],
+            "url": entry["url"],
+            "channel": entry.get("uploader", "N/A"),
+            "duration": entry.get("duration", 0),
+            "view_count": entry.get("view_count", 0),
+        }
+        for entry in (info.get("entries") or [])[:MAX_TRENDING_ENTRIES]
+        # Ensure we have valid video data
+        if entry.get("id") and entry.get("url")
+    ]
+    if not videos:
+        raise RuntimeError(
+            "Trending feed access restricted. YouTube may require authentication "
+            "or block programmatic access."
+        )
+    return videos
+
+
+def refresh(region: str) -> Dict[str, Any]:
+    """
+    Fetch region's feed and store it as the new snapshot. On failure the
+    previous videos are kept and only last_error/attempted_at change.
+    """
+    region = region.upper()
+    cache = get_named_cache(_CACHE_NAME)
+    now = time.time()
+    try:
+        videos = fetch_trending(region)
+    except Exception as exc:  # noqa: BLE001
+        previous = cache.get(_key(region)) or {"region": region, "videos": [], "fetched_at": None}
+        snapshot = dict(previous, last_error=str(exc), attempted_at=now)
+    else:
+        snapshot = {
+            "region": region,
+            "videos": videos,
+            "fetched_at": now,
+            "last_error": None,
+            "attempted_at": now,
+        }
+    cache.set(_key(region), snapshot, expire=_SNAPSHOT_TTL)
+    return snapshot
+
+
+def get_snapshot(region: str) -> Dict[str, Any]:
+    """
+    Latest snapshot for region: dict with region, videos (possibly empty if
+    no fetch has ever succeeded), fetched_at, attempted_at and last_error.
+
+    Regions kept fresh by the background refresher are always served from
+    the cache. Others are refreshed inline when their last attempt is older
+    than TRENDING_REFRESH_SECONDS; concurrent callers share that refresh.
+    """
+    region = region.upper()
+    cache = get_named_cache(_CACHE_NAME)
+    max_age = Settings().trending_refresh_seconds
+    snapshot = cache.get(_key(region))
+    if snapshot is not None and (
+        (_refresher is not None and region in _refresher.regions)
+        or time.time() - snapshot["attempted_at"] < max_age
+    ):
+        record_lookup(_CACHE_NAME, hit=True)
+        return snapshot
+    record_lookup(_CACHE_NAME, hit=False)
+    with _region_lock(region):
+        # Another caller may have refreshed while this one waited
+        snapshot = cache.get(_key(region))
+        if snapshot is None or time.time() - snapshot["attempted_at"] >= max_age:
+            snapshot = refresh(region)
+    return snapshot
+
+
+class TrendingRefresher:
+    """Daemon thread that refreshes a fixed set of regions every interval seconds."""
+
+    def __init__(self, regions: Iterable[str], interval: float):
+        self.regions = tuple(dict.fromkeys(r.strip().upper() for r in regions if r.strip()))
+        self.interval = max(60.0, interval)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="youtube-agent-trending", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            for region in self.regions:
+                if self._stop.is_set():
+                    return
+                with _region_lock(region):
+                    try:
+                        refresh(region)
+                    except Exception:  # noqa: BLE001
+                        # e.g. the cache is unavailable; try again next round
+                        pass
+            self._stop.wait(self.interval)
+
+
+_refresher: Optional[TrendingRefresher] = None
+
+
+def start_refresher(settings: Optional[Settings] = None) -> Optional[TrendingRefresher]:
+    """Start refreshing TRENDING_REGIONS in the background (no-op when none are set)."""
+    global _refresher
+    settings = settings or Settings()
+    regions = settings.trending_regions.split(",")
+    if _refresher is not None or not any(r.strip() for r in regions):
+        return _refresher
+    _refresher = TrendingRefresher(regions, settings.trending_refresh_seconds)
+    _refresher.start()
+    return _refresher
+
+
+def stop_refresher() -> None:
+    global _refresher
+    if _refresher is not None:
+        _refresher.stop()
+        _refresher = None
+
+
+def stats() -> Dict[str, Any]:
+    """Refresher regions and the age/error of each stored snapshot."""
+    cache = get_named_cache(_CACHE_NAME)
+    regions = _refresher.regions if _refresher is not None else ()
+    now = time.time()
+    snapshots = {}
+    for region in regions:
+        snapshot = cache.get(_key(region))
+        if snapshot is None:
+            snapshots[region] = None
+            continue
+        fetched_at = snapshot.get("fetched_at")
+        snapshots[region] = {
+            "videos": len(snapshot["videos"]),
+            "age_seconds": round(now - fetched_at) if fetched_at else None,
+            "last_error": snapshot.get("last_error"),
+        }
+    return {"background_regions": list(regions), "snapshots": snapshots}
@@ -0,0 +1,220 @@
+"""Pool of reusable yt-dlp extractors, keyed by option profile and geo country."""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional, Tuple
+
+from .config import Settings
+
+if TYPE_CHECKING:
+    import yt_dlp
+
+
+ydl_logger = logging.getLogger("yt_dlp")
+ydl_logger.setLevel(logging.ERROR)
+
+# Option sets the tools use. "full" resolves one video's complete info dict;
+# "flat" lists a feed's entries without resolving each video.
+PROFILES: Dict[str, dict] = {
+    "full": {"quiet": True, "logger": ydl_logger},
+    "flat": {
+        "extract_flat": True,
+        "quiet": True,
+        "no_warnings": True,
+        "logger": ydl_logger,
+        "skip_download": True,
+    },
+}
+
+_PoolKey = Tuple[str, Optional[str]]
+
+
+class _Pooled:
+    __slots__ = ("ydl", "key", "created", "uses")
+
+    def __init__(self, ydl: "yt_dlp.YoutubeDL", key: _PoolKey):
+        self.ydl = ydl
+        self.key = key
+        self.created = time.monotonic()
+        self.uses = 0
+
+
+class YoutubeDLPool:
+    """
+    Thread-safe pool of YoutubeDL instances.
+
+    Building a YoutubeDL parses options, registers extractors and opens an
+    HTTP session, so instances are kept and lent out one borrower at a time
+    (they are not safe to share between threads). At most max_size
+    instances exist at once; when the pool is full, an idle instance of
+    another profile is closed to make room, otherwise borrowers wait.
+    Instances are recycled after max_uses borrows, after max_age seconds,
+    or when a borrower fails with anything other than a yt-dlp download
+    error (e.g. a broken session). Each instance keeps its own keep-alive
+    connections; socket_timeout bounds a stalled read.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 8,
+        max_uses: int = 100,
+        max_age: float = 900,
+        socket_timeout: Optional[float] = None,
+    ):
+        self.max_size = max(1, max_size)
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.socket_timeout = socket_timeout
+        self._idle: Dict[_PoolKey, List[_Pooled]] = {}
+        self._live = 0
+        self._cond = threading.Condition()
+        self.created = 0
+        self.recycled = 0
+
+    def _expired(self, pooled: _Pooled) -> bool:
+        return pooled.uses >= self.max_uses or time.monotonic() - pooled.created >= self.max_age
+
+    def _build(self, key: _PoolKey) -> _Pooled:
+        # yt-dlp takes a while to import; only processes that extract pay for it
+        import yt_dlp
+
+        profile, geo = key
+        options = dict(PROFILES[profile])
+        if geo:
+            options["geo_bypass_country"] = geo
+        if self.socket_timeout:
+            options["socket_timeout"] = self.socket_timeout
+        pooled = _Pooled(yt_dlp.YoutubeDL(options), key)
+        with self._cond:
+            self.created += 1
+        return pooled
+
+    def _discard(self, pooled: _Pooled) -> None:
+        """Close an instance that has already been removed from the pool's accounting."""
+        with self._cond:
+            self.recycled += 1
+        try:
+            pooled.ydl.close()
+        except Exception:  # noqa: BLE001
+            pass
+
+    def _acquire(self, key: _PoolKey) -> _Pooled:
+        stale: List[_Pooled] = []
+        try:
+            with self._cond:
+                while True:
+                    idle = self._idle.get(key)
+                    while idle:
+                        pooled = idle.pop()
+                        if not self._expired(pooled):
+                            return pooled
+                        self._live -= 1
+                        stale.append(pooled)
+                    if self._live < self.max_size:
+                        self._live += 1
+                        break
+                    victim = next((lst.pop() for lst in self._idle.values() if lst), None)
+                    if victim is not None:
+                        self._live -= 1
+                        stale.append(victim)
+                        continue
+                    self._cond.wait()
+        finally:
+            for pooled in stale:
+                self._discard(pooled)
+        try:
+            return self._build(key)
+        except BaseException:
+            with self._cond:
+                self._live -= 1
+                self._cond.notify()
+            raise
+
+    def _release(self, pooled: _Pooled, healthy: bool) -> None:
+        pooled.uses += 1
+        keep = healthy and not self._expired(pooled)
+        with self._cond:
+            if keep:
+                self._idle.setdefault(pooled.key, []).append(pooled)
+            else:
+                self._live -= 1
+            self._cond.notify()
+        if not keep:
+            self._discard(pooled)
+
+    @contextmanager
+    def borrow(self, profile: str = "full", geo: Optional[str] = None) -> Iterator["yt_dlp.YoutubeDL"]:
+        """Lend a YoutubeDL for one profile/geo pair; it goes back to the pool on exit."""
+        from yt_dlp.utils import DownloadError
+
+        pooled = self._acquire((profile, geo.upper() if geo else None))
+        healthy = True
+        try:
+            yield pooled.ydl
+        except DownloadError:
+            # Unavailable/private videos are ordinary results, not a broken extractor
+            raise
+        except BaseException:
+            healthy = False
+            raise
+        finally:
+            self._release(pooled, healthy)
+
+    def prewarm(self, profile: str = "full", geo: Optional[str] = None, count: int = 1) -> None:
+        """Build up to count idle instances ahead of the first request."""
+        key = (profile, geo.upper() if geo else None)
+        for _ in range(count):
+            with self._cond:
+                if self._live >= self.max_size:
+                    return
+                self._live += 1
+            try:
+                pooled = self._build(key)
+            except BaseException:
+                with self._cond:
+                    self._live -= 1
+                raise
+            with self._cond:
+                self._idle.setdefault(key, []).append(pooled)
+                self._cond.notify()
+
+    def close(self) -> None:
+        """Close every idle instance (borrowed ones are closed when returned)."""
+        with self._cond:
+            idle = [p for lst in self._idle.values() for p in lst]
+            self._idle.clear()
+            self._live -= len(idle)
+            self._cond.notify_all()
+        for pooled in idle:
+            self._discard(pooled)
+
+    def stats(self) -> dict:
+        with self._cond:
+            return {
+                "live": self._live,
+                "idle": sum(len(lst) for lst in self._idle.values()),
+                "max_size": self.max_size,
+                "created": self.created,
+                "recycled": self.recycled,
+            }
+
+
+_POOL: Optional[YoutubeDLPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def get_ydl_pool() -> YoutubeDLPool:
+    global _POOL
+    if _POOL is None:
+        with _POOL_LOCK:
+            if _POOL is None:
+                settings = Settings()
+                _POOL = YoutubeDLPool(
+                    max_size=settings.ytdlp_pool_size,
+                    max_uses=settings.ytdlp_pool_max_uses,
+                    max_age=settings.ytdlp_pool_max_age,
+                    socket_timeout=settings.http_read_timeout,
+                )
+    return _POOL
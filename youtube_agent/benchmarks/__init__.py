@@ -0,0 +1 @@
+"""Offline benchmark harness: replays recorded LLM and YouTube payloads through the agent."""
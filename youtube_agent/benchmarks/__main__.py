@@ -0,0 +1,129 @@
+"""
+Offline benchmark CLI.
+
+    python -m youtube_agent.benchmarks --clients 8
+    python -m youtube_agent.benchmarks --output baseline.json
+    python -m youtube_agent.benchmarks --baseline baseline.json --tolerance 0.15
+
+Exits with status 1 when --baseline is given and a metric regressed by more
+than --tolerance.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import tempfile
+
+
+_COLUMNS = (
+    "requests",
+    "errors",
+    "throughput_rps",
+    "p50_ms",
+    "p95_ms",
+    "p99_ms",
+    "cache_hit_ratio",
+    "peak_memory_mb",
+)
+
+
+def _print_table(results: dict) -> None:
+    config = results["config"]
+    print(
+        f"target={config['target']} clients={config['clients']} "
+        f"requests={config['requests']} max_parallel_tools={config['max_parallel_tools']}"
+    )
+    print(f"{'phase':<6}" + "".join(f"{c:>16}" for c in _COLUMNS))
+    for phase in ("cold", "warm"):
+        row = results[phase]
+        print(f"{phase:<6}" + "".join(f"{str(row[c]):>16}" for c in _COLUMNS))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the agent offline against recorded LLM and YouTube fixtures"
+    )
+    parser.add_argument("--clients", type=int, default=4, help="Concurrent clients (default: 4)")
+    parser.add_argument(
+        "--requests", type=int, default=None, help="Requests per phase (default: 2 per scenario per client)"
+    )
+    parser.add_argument(
+        "--target",
+        choices=("app", "chain"),
+        default="app",
+        help="Send queries through the FastAPI app (default) or straight to the chain",
+    )
+    parser.add_argument(
+        "--max-parallel-tools",
+        type=int,
+        default=None,
+        help="Override MAX_PARALLEL_TOOLS (e.g. 1 to compare against sequential tools)",
+    )
+    parser.add_argument(
+        "--latency-scale",
+        type=float,
+        default=1.0,
+        help="Multiply the recorded LLM/network latencies (0 measures pure overhead)",
+    )
+    parser.add_argument(
+        "--response-cache",
+        action="store_true",
+        help="Keep the whole-query response cache on (off by default: repeats would skip the agent)",
+    )
+    parser.add_argument("--fixtures", default=None, help="Fixtures JSON (default: bundled)")
+    parser.add_argument("--no-memory", action="store_true", help="Skip tracemalloc (it slows every allocation)")
+    parser.add_argument("--output", default=None, help="Write results as JSON")
+    parser.add_argument("--baseline", default=None, help="Results JSON to compare against")
+    parser.add_argument(
+        "--tolerance", type=float, default=0.2, help="Allowed regression vs baseline (default: 0.2)"
+    )
+    args = parser.parse_args()
+
+    # A throwaway cache directory and a placeholder key: nothing reaches a provider
+    os.environ["CACHE_DIR"] = tempfile.mkdtemp(prefix="youtube-agent-bench-")
+    os.environ["LLM_PROVIDER"] = "groq"
+    os.environ.setdefault("GROQ_API_KEY", "offline-benchmark")
+    if args.max_parallel_tools is not None:
+        os.environ["MAX_PARALLEL_TOOLS"] = str(args.max_parallel_tools)
+    os.environ.setdefault("MAX_PARALLEL_TOOLS", "4")
+    if not args.response_cache:
+        # Every scenario repeats, so with answers cached both phases would
+        # mostly time cache hits instead of tool and LLM work
+        os.environ["RESPONSE_CACHE_TTL"] = "0"
+
+    # Imported only now: the app opens its cache directory at import time
+    from .harness import find_regressions, run_benchmark
+    from .replay import load_fixtures, replay_environment
+
+    fixtures = load_fixtures(args.fixtures)
+    with replay_environment(fixtures, latency_scale=args.latency_scale):
+        results = asyncio.run(
+            run_benchmark(
+                fixtures,
+                clients=args.clients,
+                requests=args.requests,
+                target=args.target,
+                measure_memory=not args.no_memory,
+            )
+        )
+    results["config"]["max_parallel_tools"] = int(os.environ["MAX_PARALLEL_TOOLS"])
+    results["config"]["latency_scale"] = args.latency_scale
+    results["config"]["response_cache"] = args.response_cache
+    _print_table(results)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = find_regressions(results, json.load(f), args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
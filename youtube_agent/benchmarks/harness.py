@@ -0,0 +1,167 @@
+"""Drive the agent with concurrent clients and collect latency, throughput, cache and memory figures."""
+
+import asyncio
+import math
+import time
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+from ..app.agent import get_universal_chain, reload_chains
+from ..app.api import app
+from ..app.cache import clear_cache, get_cache_stats
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """Nearest-rank percentile; None for an empty list."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+def _cache_counts() -> Dict[str, int]:
+    totals = {"hits": 0, "misses": 0}
+    for stats in get_cache_stats()["functions"].values():
+        totals["hits"] += stats["hits"] + stats["coalesced"]
+        totals["misses"] += stats["misses"]
+    return totals
+
+
+async def _send_app(client: httpx.AsyncClient, query: str) -> bool:
+    response = await client.post("/query", json={"query": query})
+    return response.status_code == 200 and response.json().get("success", False)
+
+
+async def _send_chain(client: Any, query: str) -> bool:
+    messages = await get_universal_chain().ainvoke({"query": query})
+    return bool(messages[-1].content)
+
+
+async def run_phase(
+    queries: List[str],
+    clients: int,
+    requests: int,
+    target: str = "app",
+    measure_memory: bool = True,
+) -> Dict[str, Any]:
+    """
+    Send `requests` queries from `clients` concurrent clients and summarize.
+
+    Client i sends queries i, i + clients, i + 2 * clients, ... (cycling over
+    the scenario list), so every scenario is exercised at every concurrency.
+    """
+    send = _send_app if target == "app" else _send_chain
+    latencies: List[float] = []
+    errors = 0
+    before = _cache_counts()
+    if measure_memory:
+        tracemalloc.reset_peak()
+
+    async def _client(index: int, client: Any) -> None:
+        nonlocal errors
+        for n in range(index, requests, clients):
+            started = time.perf_counter()
+            try:
+                ok = await send(client, queries[n % len(queries)])
+            except Exception:  # noqa: BLE001
+                ok = False
+            latencies.append(time.perf_counter() - started)
+            errors += not ok
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://benchmark", timeout=None
+    ) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(_client(i, client) for i in range(clients)))
+        wall = time.perf_counter() - started
+
+    after = _cache_counts()
+    hits = after["hits"] - before["hits"]
+    lookups = hits + after["misses"] - before["misses"]
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "wall_seconds": round(wall, 3),
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else None,
+        "p50_ms": _ms(percentile(latencies, 50)),
+        "p95_ms": _ms(percentile(latencies, 95)),
+        "p99_ms": _ms(percentile(latencies, 99)),
+        "max_ms": _ms(max(latencies, default=None)),
+        "cache_hit_ratio": round(hits / lookups, 4) if lookups else None,
+        "peak_memory_mb": (
+            round(tracemalloc.get_traced_memory()[1] / (1024 * 1024), 2)
+            if measure_memory
+            else None
+        ),
+    }
+
+
+def _ms(seconds: Optional[float]) -> Optional[float]:
+    return round(seconds * 1000, 1) if seconds is not None else None
+
+
+async def run_benchmark(
+    fixtures: dict,
+    clients: int = 4,
+    requests: Optional[int] = None,
+    target: str = "app",
+    measure_memory: bool = True,
+) -> Dict[str, Any]:
+    """
+    Run a cold phase (empty cache) and a warm phase (cache filled by the cold
+    phase) over every scenario in the fixtures.
+
+    Call inside replay_environment() so no request leaves the process.
+    """
+    queries = [s["query"] for s in fixtures["scenarios"]]
+    requests = requests or len(queries) * clients * 2
+    reload_chains()
+    clear_cache()
+    if measure_memory:
+        tracemalloc.start()
+    try:
+        cold = await run_phase(queries, clients, requests, target, measure_memory)
+        warm = await run_phase(queries, clients, requests, target, measure_memory)
+    finally:
+        if measure_memory:
+            tracemalloc.stop()
+        # The replay model must not outlive the benchmark in this process
+        reload_chains()
+    return {
+        "config": {"clients": clients, "requests": requests, "target": target},
+        "cold": cold,
+        "warm": warm,
+    }
+
+
+# Lower is better for latency and memory, higher for throughput
+_REGRESSION_METRICS = {
+    "p50_ms": 1,
+    "p95_ms": 1,
+    "p99_ms": 1,
+    "peak_memory_mb": 1,
+    "throughput_rps": -1,
+}
+
+
+def find_regressions(
+    results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """List metrics that are worse than the baseline by more than tolerance (a fraction)."""
+    regressions = []
+    for phase in ("cold", "warm"):
+        for metric, direction in _REGRESSION_METRICS.items():
+            current = results[phase].get(metric)
+            previous = baseline.get(phase, {}).get(metric)
+            if current is None or not previous:
+                continue
+            change = (current - previous) / previous * direction
+            if change > tolerance:
+                regressions.append(
+                    f"{phase}.{metric}: {previous} -> {current} ({change:+.0%} worse)"
+                )
+    return regressions
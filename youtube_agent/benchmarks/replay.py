@@ -0,0 +1,162 @@
+"""Replay recorded LLM and YouTube payloads so the agent runs without network access."""
+
+import asyncio
+import json
+import time
+from contextlib import ExitStack, contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+from unittest import mock
+
+import pytube
+import yt_dlp
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from youtube_transcript_api import YouTubeTranscriptApi
+
+from ..app import llm
+from ..app.tokens import estimate_tokens
+
+
+FIXTURES_PATH = Path(__file__).with_name("fixtures.json")
+
+
+def load_fixtures(path: Optional[Path] = None) -> dict:
+    with open(path or FIXTURES_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Chat model that answers from recorded scenario scripts.
+
+    The scenario is picked by the conversation's user message, and the turn
+    by how many AI messages the prompt already holds, so the script replays
+    identically however the agent trims its history. Prompts that belong to
+    no scenario (summarizer map/reduce calls) get a short deterministic
+    summary. Every call sleeps latency_seconds to stand in for the provider.
+    """
+
+    scripts: Dict[str, List[dict]]
+    latency_seconds: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _respond(self, messages) -> AIMessage:
+        query = next((m.content for m in messages if isinstance(m, HumanMessage)), "")
+        script = self.scripts.get(query)
+        prompt_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+        if script is None:
+            content = f"Summary of {len(str(query))} characters: {str(query)[:80]}"
+            return self._message(content, [], prompt_tokens)
+        turn = sum(isinstance(m, AIMessage) for m in messages)
+        # Past the end of the script (e.g. a guard asked for a final answer): repeat the answer
+        step = script[min(turn, len(script) - 1)]
+        tool_calls = [
+            {"name": tc["name"], "args": tc["args"], "id": f"call_{turn}_{i}"}
+            for i, tc in enumerate(step.get("tool_calls", []))
+        ]
+        return self._message(step.get("content", ""), tool_calls, prompt_tokens)
+
+    @staticmethod
+    def _message(content: str, tool_calls: List[dict], prompt_tokens: int) -> AIMessage:
+        output_tokens = estimate_tokens(content) + 20 * len(tool_calls)
+        return AIMessage(
+            content=content,
+            tool_calls=tool_calls,
+            usage_metadata={
+                "input_tokens": prompt_tokens,
+                "output_tokens": output_tokens,
+                "total_tokens": prompt_tokens + output_tokens,
+            },
+        )
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        time.sleep(self.latency_seconds)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+    async def _agenerate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        await asyncio.sleep(self.latency_seconds)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(messages))])
+
+
+def _transcript_snippets(spec: dict) -> List[dict]:
+    """Expand a transcript fixture; "repeat" tiles the snippets to build a long video."""
+    snippets = spec["snippets"]
+    span = snippets[-1]["start"] + snippets[-1]["duration"]
+    return [
+        dict(s, start=round(s["start"] + k * span, 3))
+        for k in range(spec.get("repeat", 1))
+        for s in snippets
+    ]
+
+
+@contextmanager
+def replay_environment(fixtures: dict, latency_scale: float = 1.0) -> Iterator[None]:
+    """
+    Patch the LLM factory, yt-dlp, pytube search and the transcript API to
+    serve fixtures. Each patched call sleeps its recorded latency times
+    latency_scale; anything missing from the fixtures fails like the real
+    library would on an unavailable video.
+    """
+    latency = {k: v / 1000 * latency_scale for k, v in fixtures["latency_ms"].items()}
+    scripts = {s["query"]: s["llm"] for s in fixtures["scenarios"]}
+    transcripts = {vid: _transcript_snippets(spec) for vid, spec in fixtures["transcripts"].items()}
+
+    def _build_chat_model(settings):
+        return ReplayChatModel(scripts=scripts, latency_seconds=latency["llm"])
+
+    def _extract_info(self, url, download=True, *args, **kwargs):
+        time.sleep(latency["yt_dlp"])
+        if url not in fixtures["yt_dlp"]:
+            raise yt_dlp.utils.DownloadError(f"ERROR: [replay] {url}: Video unavailable")
+        return json.loads(json.dumps(fixtures["yt_dlp"][url]))
+
+    class _Search:
+        """Answers fetch_query with an innertube-shaped page of fixture results."""
+
+        def __init__(self, query: str):
+            self.query = query
+
+        def fetch_query(self, continuation=None):
+            time.sleep(latency["search"])
+            renderers = [
+                {
+                    "videoRenderer": {
+                        "videoId": r["video_id"],
+                        "title": {"runs": [{"text": r["title"]}]},
+                        "ownerText": {"runs": [{"text": r.get("channel", "")}]},
+                        "lengthText": {"simpleText": r.get("length", "")},
+                        "viewCountText": {"simpleText": f"{r.get('views', 0):,} views"},
+                        "publishedTimeText": {"simpleText": r.get("published", "")},
+                    }
+                }
+                for r in fixtures["search"].get(self.query, [])
+            ]
+            contents = [{"itemSectionRenderer": {"contents": renderers}}]
+            return {
+                "contents": {
+                    "twoColumnSearchResultsRenderer": {
+                        "primaryContents": {"sectionListRenderer": {"contents": contents}}
+                    }
+                }
+            }
+
+    def _fetch(self, video_id, languages=("en",), *args, **kwargs):
+        time.sleep(latency["transcript"])
+        if video_id not in transcripts:
+            raise RuntimeError(f"Could not retrieve a transcript for the video {video_id}")
+        return transcripts[video_id]
+
+    with ExitStack() as stack:
+        stack.enter_context(mock.patch.object(llm, "build_chat_model", _build_chat_model))
+        stack.enter_context(mock.patch.object(yt_dlp.YoutubeDL, "extract_info", _extract_info))
+        stack.enter_context(mock.patch.object(pytube, "Search", _Search))
+        stack.enter_context(mock.patch.object(YouTubeTranscriptApi, "fetch", _fetch))
+        yield